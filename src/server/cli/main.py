@@ -1670,6 +1670,9 @@ def server_command(host, port, reload, workers, init_db):
         port=port,
         reload=reload,
         workers=workers,
+        loop="auto",
+        http="auto",
+        backlog=2048,
         log_level="info"
     )
 
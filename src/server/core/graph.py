@@ -1,24 +1,32 @@
 """LangGraph agent using Ollama API with tools and RAG (Qdrant + Remote Embeddings)"""
 import os
-import hashlib
-import json
+import asyncio
+import threading
+import time
 import traceback
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import TypedDict, Annotated, Sequence, Literal, List, Optional, Dict, Any, Callable
+from itertools import islice
+from typing import TYPE_CHECKING, TypedDict, Annotated, Sequence, Literal, List, Optional, Dict, Any, Callable, Iterator, Tuple
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage, SystemMessage
 from langchain_core.tools import tool, Tool, StructuredTool
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.http import models as qdrant_models
 import operator
 import httpx
 from pydantic import BaseModel, Field, create_model
 from server.server.config import get_active_model, get_config_store, get_tool_store, get_kb_store, KnowledgeBase
 
+# Qdrant and the text splitter are imported where they are first used, so
+# processes that never touch RAG do not pay for loading them
+if TYPE_CHECKING:
+    from langchain_qdrant import QdrantVectorStore
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from qdrant_client.http import models as qdrant_models
+
 # RAG Configuration helpers live inside the admin config store
 def is_rag_enabled(model_id: Optional[str] = None) -> bool:
     """Expose the RAG toggle so callers can gate RAG endpoints."""
@@ -45,28 +53,97 @@ def _get_model_for_request(model_id: Optional[str] = None):
 # Qdrant Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+# gRPC sends vectors as packed floats instead of JSON text
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true"
 
 # Remote Embedding Configuration
 RAG_EMBEDDING_ENGINE = os.getenv("RAG_EMBEDDING_ENGINE", "openai")
 RAG_OPENAI_API_BASE_URL = os.getenv("RAG_OPENAI_API_BASE_URL", "https://api.openai.com/v1")
 RAG_OPENAI_API_KEY = os.getenv("RAG_OPENAI_API_KEY", "")
 RAG_EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "text-embedding-ada-002")
+# Vector size of the embedding model; 0 means look it up in EMBEDDING_DIMS or probe the API
+RAG_EMBEDDING_DIM = int(os.getenv("RAG_EMBEDDING_DIM", "0"))
+EMBEDDING_DIMS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "multilingual-e5-large": 1024,
+}
+# Number of chunks sent per embeddings request during imports
+RAG_EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "512"))
+# Maximum embeddings requests in flight for a single async import
+RAG_EMBED_CONCURRENCY = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))
+# Number of points sent per Qdrant upsert and upserts in flight during imports
+RAG_UPSERT_BATCH_SIZE = int(os.getenv("RAG_UPSERT_BATCH_SIZE", "5000"))
+RAG_UPSERT_CONCURRENCY = int(os.getenv("RAG_UPSERT_CONCURRENCY", "4"))
+# Concurrent async imports into the same KB are coalesced for up to this many
+# milliseconds, or until an upsert batch worth of chunks is pending
+RAG_IMPORT_BATCH_WAIT_MS = int(os.getenv("RAG_IMPORT_BATCH_WAIT_MS", "20"))
+# Retrieval results are reused for identical queries within the TTL (0 disables)
+RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "60"))
+RAG_CACHE_MAXSIZE = int(os.getenv("RAG_CACHE_MAXSIZE", "1024"))
+# Query embeddings are deterministic per model, so they are kept until evicted
+RAG_QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+# Seconds to reuse knowledge base stats and document listings (0 disables)
+RAG_STATS_CACHE_TTL = float(os.getenv("RAG_STATS_CACHE_TTL", "2"))
+RAG_STATS_CACHE_MAXSIZE = 256
+# Store vectors of newly created collections memory-mapped on disk instead of in RAM
+RAG_VECTORS_ON_DISK = os.getenv("RAG_VECTORS_ON_DISK", "false").lower() == "true"
+# Quantization for newly created collections: "none" or "int8" (scalar, about 4x less
+# memory per vector; Qdrant rescores the top hits with the original vectors)
+RAG_QUANTIZATION = os.getenv("RAG_QUANTIZATION", "none").lower()
+# HNSW candidate list size for searches; higher is more accurate but slower (0 keeps Qdrant's default)
+RAG_HNSW_EF = int(os.getenv("RAG_HNSW_EF", "0"))
 
 # Global instances
-_vector_store: Optional[QdrantVectorStore] = None
+_vector_store: Optional["QdrantVectorStore"] = None
 _embeddings: Optional[OpenAIEmbeddings] = None
-_qdrant_client: Optional[QdrantClient] = None
-_llm_cache: Dict[str, ChatOpenAI] = {}  # Cache LLM clients by config hash
-
-
-def get_qdrant_client() -> QdrantClient:
+_qdrant_client: Optional["QdrantClient"] = None
+_async_qdrant_client: Optional["AsyncQdrantClient"] = None
+_text_splitter: Optional["RecursiveCharacterTextSplitter"] = None
+_embedding_dim: Optional[int] = None
+_llm_cache: Dict[tuple, ChatOpenAI] = {}  # Cache LLM clients by config
+_bound_llm_cache: Dict[tuple, Any] = {}  # Cache tool-bound LLMs by (llm, tool names)
+_tool_map_cache: Dict[tuple, Dict[str, Any]] = {}  # Cache name -> tool maps by tool names
+_llm_http_client: Optional[httpx.Client] = None
+_llm_async_http_client: Optional[httpx.AsyncClient] = None
+_retrieval_cache: "OrderedDict[tuple, Tuple[float, List[Document]]]" = OrderedDict()
+_query_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+_kb_read_cache: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_qdrant_client() -> "QdrantClient":
     """Get or create Qdrant client"""
     global _qdrant_client
     if _qdrant_client is None:
-        _qdrant_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+        from qdrant_client import QdrantClient
+        
+        _qdrant_client = QdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=QDRANT_PREFER_GRPC,
+        )
     return _qdrant_client
 
 
+def get_async_qdrant_client() -> "AsyncQdrantClient":
+    """Get or create the async Qdrant client used by async import paths"""
+    global _async_qdrant_client
+    if _async_qdrant_client is None:
+        from qdrant_client import AsyncQdrantClient
+        
+        _async_qdrant_client = AsyncQdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=QDRANT_PREFER_GRPC,
+        )
+    return _async_qdrant_client
+
+
 def get_embeddings() -> OpenAIEmbeddings:
     """Get or create embeddings model using remote OpenAI-compatible API"""
     global _embeddings
@@ -76,10 +153,23 @@ def get_embeddings() -> OpenAIEmbeddings:
             openai_api_key=RAG_OPENAI_API_KEY,
             openai_api_base=RAG_OPENAI_API_BASE_URL,
             check_embedding_ctx_length=False,  # Disable tokenization, send raw text
+            chunk_size=RAG_EMBED_BATCH_SIZE,
         )
     return _embeddings
 
 
+def get_embedding_dim() -> int:
+    """Return the embedding vector size, probing the API only for unknown models"""
+    global _embedding_dim
+    if _embedding_dim is None:
+        _embedding_dim = (
+            RAG_EMBEDDING_DIM
+            or EMBEDDING_DIMS.get(RAG_EMBEDDING_MODEL)
+            or len(get_embeddings().embed_query("test"))
+        )
+    return _embedding_dim
+
+
 def ensure_collection_exists(kb_id: Optional[str] = None):
     """Ensure Qdrant collection exists, create if not"""
     client = get_qdrant_client()
@@ -94,26 +184,33 @@ def ensure_collection_exists(kb_id: Optional[str] = None):
         # Default collection for backwards compatibility
         collection_name = os.getenv("QDRANT_COLLECTION", "knowledge_base")
     
-    collections = client.get_collections().collections
-    collection_names = [c.name for c in collections]
-    
-    if collection_name not in collection_names:
-        embeddings = get_embeddings()
-        test_embedding = embeddings.embed_query("test")
-        embedding_dim = len(test_embedding)
+    if not client.collection_exists(collection_name):
+        from qdrant_client.http import models as qdrant_models
         
+        embedding_dim = get_embedding_dim()
+        quantization_config = None
+        if RAG_QUANTIZATION == "int8":
+            quantization_config = qdrant_models.ScalarQuantization(
+                scalar=qdrant_models.ScalarQuantizationConfig(
+                    type=qdrant_models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True,
+                )
+            )
         client.create_collection(
             collection_name=collection_name,
             vectors_config=qdrant_models.VectorParams(
                 size=embedding_dim,
-                distance=qdrant_models.Distance.COSINE
-            )
+                distance=qdrant_models.Distance.COSINE,
+                on_disk=RAG_VECTORS_ON_DISK,
+            ),
+            quantization_config=quantization_config,
         )
         print(f"Created Qdrant collection '{collection_name}' with dimension {embedding_dim}")
     return True
 
 
-def get_vector_store(kb_id: Optional[str] = None) -> Optional[QdrantVectorStore]:
+def get_vector_store(kb_id: Optional[str] = None) -> Optional["QdrantVectorStore"]:
     """Get or create the vector store for a specific knowledge base"""
     global _vector_store
     
@@ -139,6 +236,8 @@ def get_vector_store(kb_id: Optional[str] = None) -> Optional[QdrantVectorStore]
     
     if _vector_store is None:
         try:
+            from langchain_qdrant import QdrantVectorStore
+            
             ensure_collection_exists(kb_id)
             embeddings = get_embeddings()
             _vector_store = QdrantVectorStore(
@@ -154,38 +253,249 @@ def get_vector_store(kb_id: Optional[str] = None) -> Optional[QdrantVectorStore]
     return _vector_store
 
 
+def _resolve_top_k(k: Optional[int], kb_id: Optional[str]) -> int:
+    """Default k for retrieval when the caller did not specify one."""
+    if k is not None:
+        return k
+    # Use default k if no kb_id, or get from model if kb_id not provided
+    if kb_id:
+        return 3  # Default for KB-specific queries
+    return get_rag_settings().top_k
+
+
+def _get_cached_retrieval(key: tuple) -> Optional[List[Document]]:
+    """Return cached documents for a retrieval key if they have not expired."""
+    if RAG_CACHE_TTL <= 0:
+        return None
+    with _retrieval_cache_lock:
+        entry = _retrieval_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, docs = entry
+        if expires_at < time.monotonic():
+            del _retrieval_cache[key]
+            return None
+        _retrieval_cache.move_to_end(key)
+        return docs
+
+
+def _cache_retrieval(key: tuple, docs: List[Document]) -> None:
+    """Store retrieval results, evicting the least recently used entries."""
+    if RAG_CACHE_TTL <= 0:
+        return
+    with _retrieval_cache_lock:
+        _retrieval_cache[key] = (time.monotonic() + RAG_CACHE_TTL, docs)
+        _retrieval_cache.move_to_end(key)
+        while len(_retrieval_cache) > RAG_CACHE_MAXSIZE:
+            _retrieval_cache.popitem(last=False)
+
+
+def clear_retrieval_cache() -> None:
+    """Drop all cached retrieval results and knowledge base reads."""
+    with _retrieval_cache_lock:
+        _retrieval_cache.clear()
+        _kb_read_cache.clear()
+
+
+def _cached_kb_read(key: tuple, read: Callable[[], dict]) -> dict:
+    """Serve a stats or listing read from the short TTL cache; errors are not cached."""
+    if RAG_STATS_CACHE_TTL <= 0:
+        return read()
+    with _retrieval_cache_lock:
+        entry = _kb_read_cache.get(key)
+        if entry is not None and entry[0] >= time.monotonic():
+            _kb_read_cache.move_to_end(key)
+            return entry[1]
+    result = read()
+    if "error" not in result:
+        with _retrieval_cache_lock:
+            _kb_read_cache[key] = (time.monotonic() + RAG_STATS_CACHE_TTL, result)
+            _kb_read_cache.move_to_end(key)
+            while len(_kb_read_cache) > RAG_STATS_CACHE_MAXSIZE:
+                _kb_read_cache.popitem(last=False)
+    return result
+
+
+def _get_cached_query_embedding(query: str) -> Optional[List[float]]:
+    """Return the cached embedding for a query, if any."""
+    with _retrieval_cache_lock:
+        vector = _query_embedding_cache.get(query)
+        if vector is not None:
+            _query_embedding_cache.move_to_end(query)
+        return vector
+
+
+def _cache_query_embedding(query: str, vector: List[float]) -> List[float]:
+    """Store a query embedding, evicting the least recently used entries."""
+    with _retrieval_cache_lock:
+        _query_embedding_cache[query] = vector
+        while len(_query_embedding_cache) > RAG_QUERY_EMBEDDING_CACHE_SIZE:
+            _query_embedding_cache.popitem(last=False)
+    return vector
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace so retries and reformatted copies of a query share cache entries."""
+    return " ".join(query.split())
+
+
+def _embed_query(query: str) -> List[float]:
+    """Embed a retrieval query, reusing earlier embeddings of the same text."""
+    vector = _get_cached_query_embedding(query)
+    if vector is None:
+        vector = _cache_query_embedding(query, get_embeddings().embed_query(query))
+    return vector
+
+
+async def _aembed_query(query: str) -> List[float]:
+    """Async variant of _embed_query."""
+    vector = _get_cached_query_embedding(query)
+    if vector is None:
+        vector = _cache_query_embedding(query, await get_embeddings().aembed_query(query))
+    return vector
+
+
+def _search_params() -> Optional["qdrant_models.SearchParams"]:
+    """Search parameters for retrieval queries, or None to use the collection defaults."""
+    if not RAG_HNSW_EF:
+        return None
+    from qdrant_client.http import models as qdrant_models
+    
+    return qdrant_models.SearchParams(hnsw_ef=RAG_HNSW_EF)
+
+
+def _points_to_documents(points: List[Any]) -> List[Document]:
+    """Rebuild documents from search hits stored in the QdrantVectorStore payload layout.
+    
+    The hit's similarity is kept as metadata["score"]; collections use cosine distance, which
+    Qdrant serves as a dot product over vectors it normalized at insert time.
+    """
+    return [
+        Document(
+            page_content=point.payload.get("page_content", ""),
+            metadata={**(point.payload.get("metadata") or {}), "score": point.score},
+        )
+        for point in points
+    ]
+
+
 def retrieve_relevant_context(query: str, k: Optional[int] = None, kb_id: Optional[str] = None) -> List[Document]:
     """Retrieve relevant documents for a query"""
-    if k is None:
-        # Use default k if no kb_id, or get from model if kb_id not provided
-        if kb_id:
-            k = 3  # Default for KB-specific queries
-        else:
-            k = get_rag_settings().top_k
+    query = _normalize_query(query)
+    k = _resolve_top_k(k, kb_id)
+    cache_key = (kb_id, query, k)
+    cached = _get_cached_retrieval(cache_key)
+    if cached is not None:
+        return list(cached)
     
     vector_store = get_vector_store(kb_id)
     if vector_store is None:
         return []
     
     try:
-        docs = vector_store.similarity_search(query, k=k)
-        return docs
+        # Query Qdrant directly so hits come back without their stored vectors
+        response = get_qdrant_client().query_points(
+            collection_name=vector_store.collection_name,
+            query=_embed_query(query),
+            limit=k,
+            search_params=_search_params(),
+            with_payload=True,
+            with_vectors=False,
+        )
+        docs = _points_to_documents(response.points)
     except Exception as e:
         print(f"Error retrieving documents: {e}")
         return []
+    _cache_retrieval(cache_key, docs)
+    return list(docs)
 
 
-def format_context(documents: List[Document]) -> str:
-    """Format retrieved documents into context string"""
-    if not documents:
-        return ""
+async def aretrieve_relevant_context(query: str, k: Optional[int] = None, kb_id: Optional[str] = None) -> List[Document]:
+    """Async variant of retrieve_relevant_context for use from request handlers"""
+    query = _normalize_query(query)
+    k = _resolve_top_k(k, kb_id)
+    cache_key = (kb_id, query, k)
+    cached = _get_cached_retrieval(cache_key)
+    if cached is not None:
+        return list(cached)
     
-    context_parts = []
-    for i, doc in enumerate(documents, 1):
-        source = doc.metadata.get("source", "unknown")
-        context_parts.append(f"[Source {i}: {source}]\n{doc.page_content}")
+    # Resolving the store may hit the config DB and Qdrant through sync clients
+    vector_store = await asyncio.to_thread(get_vector_store, kb_id)
+    if vector_store is None:
+        return []
     
-    return "\n\n---\n\n".join(context_parts)
+    try:
+        response = await get_async_qdrant_client().query_points(
+            collection_name=vector_store.collection_name,
+            query=await _aembed_query(query),
+            limit=k,
+            search_params=_search_params(),
+            with_payload=True,
+            with_vectors=False,
+        )
+        docs = _points_to_documents(response.points)
+    except Exception as e:
+        print(f"Error retrieving documents: {e}")
+        return []
+    _cache_retrieval(cache_key, docs)
+    return list(docs)
+
+
+async def aretrieve_relevant_contexts(
+    queries: List[str], k: Optional[int] = None, kb_id: Optional[str] = None
+) -> List[List[Document]]:
+    """Retrieve documents for several queries with one embeddings call and one Qdrant batch search"""
+    from qdrant_client.http import models as qdrant_models
+    
+    queries = [_normalize_query(query) for query in queries]
+    k = _resolve_top_k(k, kb_id)
+    results: List[Optional[List[Document]]] = [_get_cached_retrieval((kb_id, query, k)) for query in queries]
+    missing = [i for i, docs in enumerate(results) if docs is None]
+    if not missing:
+        return [list(docs) for docs in results]
+    
+    vector_store = await asyncio.to_thread(get_vector_store, kb_id)
+    if vector_store is None:
+        return [[] for _ in queries]
+    
+    try:
+        vectors = {i: _get_cached_query_embedding(queries[i]) for i in missing}
+        to_embed = [i for i in missing if vectors[i] is None]
+        if to_embed:
+            embedded = await get_embeddings().aembed_documents([queries[i] for i in to_embed])
+            for i, vector in zip(to_embed, embedded):
+                vectors[i] = _cache_query_embedding(queries[i], vector)
+        
+        search_params = _search_params()
+        responses = await get_async_qdrant_client().query_batch_points(
+            collection_name=vector_store.collection_name,
+            requests=[
+                qdrant_models.QueryRequest(
+                    query=vectors[i], limit=k, params=search_params, with_payload=True, with_vector=False
+                )
+                for i in missing
+            ],
+        )
+    except Exception as e:
+        print(f"Error retrieving documents: {e}")
+        return [list(docs) if docs is not None else [] for docs in results]
+    
+    for i, response in zip(missing, responses):
+        docs = _points_to_documents(response.points)
+        _cache_retrieval((kb_id, queries[i], k), docs)
+        results[i] = docs
+    return [list(docs) for docs in results]
+
+
+_CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+
+def format_context(documents: List[Document]) -> str:
+    """Format retrieved documents into context string"""
+    return _CONTEXT_SEPARATOR.join(
+        f"[Source {i}: {doc.metadata.get('source', 'unknown')}]\n{doc.page_content}"
+        for i, doc in enumerate(documents or (), 1)
+    )
 
 
 class AgentState(TypedDict):
@@ -263,9 +573,10 @@ BUILTIN_TOOLS = {
 
 # Cache for dynamically created custom tools
 _custom_tools_cache: Dict[str, StructuredTool] = {}
+# Bumped whenever the custom tool set changes so bound LLMs are rebuilt
+_custom_tools_generation = 0
 
 # Thread-local storage for request headers and chat log context
-import threading
 _request_context = threading.local()
 
 
@@ -627,6 +938,7 @@ def _get_custom_tools() -> Dict[str, StructuredTool]:
     
     tool_store = get_tool_store()
     custom_tool_configs = tool_store.get_custom_tools_with_code()
+    changed = False
     
     # Create tools for any new configs
     for config in custom_tool_configs:
@@ -634,6 +946,7 @@ def _get_custom_tools() -> Dict[str, StructuredTool]:
             tool = _create_dynamic_tool(config)
             if tool:
                 _custom_tools_cache[config.name] = tool
+                changed = True
                 print(f"Registered custom tool: {config.name}")
     
     # Remove any tools that no longer exist
@@ -641,11 +954,22 @@ def _get_custom_tools() -> Dict[str, StructuredTool]:
     to_remove = [name for name in _custom_tools_cache if name not in current_names]
     for name in to_remove:
         del _custom_tools_cache[name]
+        changed = True
         print(f"Unregistered custom tool: {name}")
     
+    if changed:
+        _invalidate_bound_tools()
     return _custom_tools_cache
 
 
+def _invalidate_bound_tools():
+    """Drop tool-bound LLMs after the custom tool set changed."""
+    global _custom_tools_generation
+    _custom_tools_generation += 1
+    _bound_llm_cache.clear()
+    _tool_map_cache.clear()
+
+
 def get_all_registered_tools() -> Dict[str, Any]:
     """Get all registered tools (builtin + custom)."""
     all_tools = dict(BUILTIN_TOOLS)
@@ -661,13 +985,74 @@ def get_active_tools(model_id: Optional[str] = None) -> List[Tool]:
     return [all_tools[name] for name in active_tool_names if name in all_tools]
 
 
+def get_active_tool_map(model_id: Optional[str] = None) -> Dict[str, Any]:
+    """Return a name -> tool mapping of the active tools, reused while the tool set is unchanged."""
+    tools = get_active_tools(model_id)
+    key = tuple(t.name for t in tools)
+    tool_map = _tool_map_cache.get(key)
+    if tool_map is None:
+        tool_map = {t.name: t for t in tools}
+        _tool_map_cache[key] = tool_map
+    return tool_map
+
+
 def reload_custom_tools():
     """Force reload of custom tools from database."""
     global _custom_tools_cache
     _custom_tools_cache = {}
+    _invalidate_bound_tools()
     return _get_custom_tools()
 
 
+def _get_llm_http_client(api_key: str) -> httpx.Client:
+    """Return the pooled HTTP client shared by every cached LLM."""
+    global _llm_http_client
+    if _llm_http_client is None:
+        _llm_http_client = httpx.Client(
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=120.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _llm_http_client
+
+
+def get_llm_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled async HTTP client for the LLM backend, shared by the LLMs and the API routes."""
+    global _llm_async_http_client
+    if _llm_async_http_client is None:
+        _llm_async_http_client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {os.getenv('OLLAMA_API_KEY', 'ollama')}"},
+            timeout=120.0,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        )
+    return _llm_async_http_client
+
+
+async def aclose_llm_http_clients() -> None:
+    """Close the pooled LLM HTTP clients; cached LLMs are dropped since they hold references to them."""
+    global _llm_http_client, _llm_async_http_client
+    _llm_cache.clear()
+    _bound_llm_cache.clear()
+    if _llm_async_http_client is not None:
+        await _llm_async_http_client.aclose()
+        _llm_async_http_client = None
+    if _llm_http_client is not None:
+        _llm_http_client.close()
+        _llm_http_client = None
+
+
+def get_llm_with_tools(model_id: Optional[str] = None):
+    """Return the LLM for a model with its active tools bound, reusing earlier bindings."""
+    llm = create_llm_for_model(model_id)
+    tools = get_active_tools(model_id)
+    key = (id(llm), tuple(t.name for t in tools))
+    bound = _bound_llm_cache.get(key)
+    if bound is None:
+        bound = llm.bind_tools(tools)
+        _bound_llm_cache[key] = bound
+    return bound
+
+
 def create_ollama_llm():
     """Create an Ollama LLM client using OpenAI-compatible API (default config)"""
     return create_llm_for_model(None)
@@ -677,7 +1062,7 @@ def create_llm_for_model(model_id: Optional[str] = None) -> ChatOpenAI:
     """Create an LLM client configured for a specific custom model or default.
     
     Uses per-model base_model and model_params if available.
-    Caches clients by configuration hash to avoid recreation.
+    Caches clients by configuration to avoid recreation.
     """
     global _llm_cache
     
@@ -693,20 +1078,12 @@ def create_llm_for_model(model_id: Optional[str] = None) -> ChatOpenAI:
     max_tokens = model_params.get("max_tokens", None)
     top_p = model_params.get("top_p", None)
     
-    # Create cache key from config
-    cache_key_data = {
-        "base_model": base_model,
-        "temperature": temperature,
-        "max_tokens": max_tokens,
-        "top_p": top_p,
-    }
-    cache_key = hashlib.md5(json.dumps(cache_key_data, sort_keys=True).encode()).hexdigest()
-    
     # Return cached client if available
-    if cache_key in _llm_cache:
-        return _llm_cache[cache_key]
+    cache_key = (base_model, temperature, max_tokens, top_p)
+    llm = _llm_cache.get(cache_key)
+    if llm is not None:
+        return llm
     
-    # Create new client
     base_url = os.getenv("OLLAMA_API_BASE_URL", "http://localhost:11434")
     api_key = os.getenv("OLLAMA_API_KEY", "ollama")
     
@@ -714,19 +1091,14 @@ def create_llm_for_model(model_id: Optional[str] = None) -> ChatOpenAI:
     if not base_url.endswith("/v1"):
         base_url = base_url.rstrip("/") + "/v1"
     
-    # Create custom HTTP client with Authorization header
-    http_client = httpx.Client(
-        headers={"Authorization": f"Bearer {api_key}"},
-        timeout=120.0
-    )
-    
     # Build kwargs for ChatOpenAI
     llm_kwargs: Dict[str, Any] = {
         "model": base_model,
         "api_key": api_key,
         "base_url": base_url,
         "temperature": temperature,
-        "http_client": http_client,
+        "http_client": _get_llm_http_client(api_key),
+        "http_async_client": get_llm_async_http_client(),
     }
     if max_tokens:
         llm_kwargs["max_tokens"] = max_tokens
@@ -814,8 +1186,7 @@ def agent_node(state: AgentState) -> dict:
     start_time = time_module.time()
     
     model_id = state.get("model_config_id")
-    llm = create_llm_for_model(model_id)
-    llm_with_tools = llm.bind_tools(get_active_tools(model_id))
+    llm_with_tools = get_llm_with_tools(model_id)
     messages = list(state["messages"])
     
     # Set chat_log_id in context
@@ -939,12 +1310,7 @@ def tool_node(state: AgentState) -> dict:
     
     tool_messages = []
     
-    # Create a mapping of tool names to tool functions
-    active_tools = get_active_tools(model_id)
-    tool_map = {t.name: t for t in active_tools}
-    
-    # Get builtin tool names for logging
-    builtin_tool_names = set(BUILTIN_TOOLS.keys())
+    tool_map = get_active_tool_map(model_id)
     
     # Get current sequence for tool ordering
     tool_sequence_start = getattr(_request_context, 'sequence_counter', 0)
@@ -962,7 +1328,7 @@ def tool_node(state: AgentState) -> dict:
             error_message = None
             error_traceback = None
             
-            is_builtin = tool_name in builtin_tool_names
+            is_builtin = tool_name in BUILTIN_TOOLS
             
             # Log tool_start event
             _log_agent_event(
@@ -1079,10 +1445,195 @@ graph = create_graph()
 
 
 # Utility functions for managing the knowledge base
+def _paginate(items: Sequence[Any], page_size: int) -> Iterator[List[Any]]:
+    """Yield successive pages of at most page_size items."""
+    iterator = iter(items)
+    while page := list(islice(iterator, page_size)):
+        yield page
+
+
+def _to_points(documents: List[Document], vectors: List[List[float]]) -> List["qdrant_models.PointStruct"]:
+    """Build Qdrant points using the payload layout QdrantVectorStore reads back."""
+    from qdrant_client.http import models as qdrant_models
+    
+    return [
+        qdrant_models.PointStruct(
+            id=uuid.uuid4().hex,
+            vector=vector,
+            payload={"page_content": doc.page_content, "metadata": doc.metadata},
+        )
+        for doc, vector in zip(documents, vectors)
+    ]
+
+
+def _add_documents_batched(
+    vector_store: "QdrantVectorStore", splits: List[Document], batch_size: Optional[int] = None
+) -> None:
+    """Embed chunks page by page and upsert the points in larger batches."""
+    embeddings = get_embeddings()
+    client = vector_store.client
+    pages = list(_paginate(splits, batch_size or RAG_EMBED_BATCH_SIZE))
+    points: List["qdrant_models.PointStruct"] = []
+    
+    for i, page in enumerate(pages):
+        vectors = embeddings.embed_documents([doc.page_content for doc in page])
+        points.extend(_to_points(page, vectors))
+        is_last = i == len(pages) - 1
+        if is_last or len(points) >= RAG_UPSERT_BATCH_SIZE:
+            client.upsert(
+                collection_name=vector_store.collection_name,
+                points=points,
+                # Qdrant applies updates in order, so waiting on the last batch
+                # is enough for the whole import to be searchable on return
+                wait=is_last,
+            )
+            points = []
+    # New points can change the results of any cached search
+    clear_retrieval_cache()
+
+
+async def _aadd_documents_batched(
+    vector_store: "QdrantVectorStore", splits: List[Document], batch_size: Optional[int] = None
+) -> None:
+    """Async variant of _add_documents_batched: pages are embedded concurrently."""
+    embeddings = get_embeddings()
+    client = get_async_qdrant_client()
+    pages = list(_paginate(splits, batch_size or RAG_EMBED_BATCH_SIZE))
+    semaphore = asyncio.Semaphore(RAG_EMBED_CONCURRENCY)
+    
+    async def embed_page(page: List[Document]) -> List[List[float]]:
+        async with semaphore:
+            return await embeddings.aembed_documents([doc.page_content for doc in page])
+    
+    page_vectors = await asyncio.gather(*(embed_page(page) for page in pages))
+    points = [
+        point
+        for page, vectors in zip(pages, page_vectors)
+        for point in _to_points(page, vectors)
+    ]
+    batches = list(_paginate(points, RAG_UPSERT_BATCH_SIZE))
+    if not batches:
+        return
+    upsert_semaphore = asyncio.Semaphore(RAG_UPSERT_CONCURRENCY)
+    
+    async def upsert_batch(batch: List["qdrant_models.PointStruct"]) -> None:
+        async with upsert_semaphore:
+            await client.upsert(collection_name=vector_store.collection_name, points=batch, wait=False)
+    
+    # Send all but the last batch concurrently; the final waited upsert is queued
+    # behind them, so it returns once the whole import is searchable
+    await asyncio.gather(*(upsert_batch(batch) for batch in batches[:-1]))
+    await client.upsert(collection_name=vector_store.collection_name, points=batches[-1], wait=True)
+    clear_retrieval_cache()
+
+
+def warm_up() -> None:
+    """Create the shared clients and the active model's tool-bound LLM ahead of the first request"""
+    get_llm_with_tools()
+    get_embeddings()
+    if is_rag_enabled():
+        get_vector_store()
+
+
+def _get_text_splitter() -> "RecursiveCharacterTextSplitter":
+    """Get or create the text splitter; it holds no per-call state, so one instance serves every import"""
+    global _text_splitter
+    if _text_splitter is None:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        
+        _text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200,
+            length_function=len,
+        )
+    return _text_splitter
+
+
+def _split_documents(documents: List[Document]) -> List[Document]:
+    """Split documents into chunks for embedding"""
+    return _get_text_splitter().split_documents(documents)
+
+
+def _texts_to_documents(texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+    """Wrap raw texts as documents, defaulting the source metadata"""
+    if metadatas is None:
+        metadatas = [{"source": f"text_{i}"} for i in range(len(texts))]
+    return [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
+
+
+class ImportBatcher:
+    """Coalesce concurrent async imports into one embedding and upsert pass per knowledge base.
+    
+    Imports are grouped by (kb_id, batch_size) so a caller's embedding batch size override
+    only applies to imports that asked for it.
+    """
+    
+    def __init__(self, max_chunks: int, max_wait_seconds: float):
+        self.max_chunks = max_chunks
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: Dict[Tuple[Optional[str], Optional[int]], List[Tuple["QdrantVectorStore", List[Document], asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[Optional[str], Optional[int]], asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+    
+    async def submit(
+        self, documents: List[Document], kb_id: Optional[str] = None, batch_size: Optional[int] = None
+    ) -> int:
+        """Queue documents for import and return the number of chunks created for them."""
+        vector_store = await asyncio.to_thread(get_vector_store, kb_id)
+        if vector_store is None:
+            raise ValueError("Vector store not initialized. Check Qdrant connection.")
+        splits = await asyncio.to_thread(_split_documents, documents)
+        if not splits:
+            return 0
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (kb_id, batch_size)
+        pending = self._pending.setdefault(key, [])
+        pending.append((vector_store, splits, future))
+        
+        if sum(len(item[1]) for item in pending) >= self.max_chunks:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait_seconds, self._flush, key)
+        return await future
+    
+    def _flush(self, key: Tuple[Optional[str], Optional[int]]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.create_task(self._run(batch, key[1]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(
+        self, batch: List[Tuple["QdrantVectorStore", List[Document], asyncio.Future]], batch_size: Optional[int]
+    ) -> None:
+        vector_store = batch[-1][0]
+        try:
+            await _aadd_documents_batched(
+                vector_store, [split for _, splits, _ in batch for split in splits], batch_size
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, splits, future in batch:
+                if not future.done():
+                    future.set_result(len(splits))
+
+
+_import_batcher = ImportBatcher(RAG_UPSERT_BATCH_SIZE, RAG_IMPORT_BATCH_WAIT_MS / 1000)
+
+
 def reload_knowledge_base(kb_id: Optional[str] = None):
     """Force reload of the vector store connection"""
     global _vector_store
     _vector_store = None
+    clear_retrieval_cache()
     return get_vector_store(kb_id)
 
 
@@ -1092,15 +1643,10 @@ def import_documents(documents: List[Document], kb_id: Optional[str] = None) ->
     if vector_store is None:
         raise ValueError("Vector store not initialized. Check Qdrant connection.")
     
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-    )
-    splits = text_splitter.split_documents(documents)
+    splits = _split_documents(documents)
     
     # Add documents to vector store
-    vector_store.add_documents(splits)
+    _add_documents_batched(vector_store, splits)
     
     return {
         "original_documents": len(documents),
@@ -1108,27 +1654,28 @@ def import_documents(documents: List[Document], kb_id: Optional[str] = None) ->
     }
 
 
+async def aimport_documents(
+    documents: List[Document], kb_id: Optional[str] = None, batch_size: Optional[int] = None
+) -> dict:
+    """Async variant of import_documents; concurrent calls share embedding and upsert batches"""
+    return {
+        "original_documents": len(documents),
+        "chunks_created": await _import_batcher.submit(documents, kb_id, batch_size)
+    }
+
+
 def import_texts(texts: List[str], metadatas: Optional[List[dict]] = None, kb_id: Optional[str] = None) -> dict:
     """Import raw texts into the knowledge base"""
     vector_store = get_vector_store(kb_id)
     if vector_store is None:
         raise ValueError("Vector store not initialized. Check Qdrant connection.")
     
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-    )
-    
     # Create documents from texts
-    if metadatas is None:
-        metadatas = [{"source": f"text_{i}"} for i in range(len(texts))]
-    
-    documents = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
-    splits = text_splitter.split_documents(documents)
+    documents = _texts_to_documents(texts, metadatas)
+    splits = _split_documents(documents)
     
     # Add documents to vector store
-    vector_store.add_documents(splits)
+    _add_documents_batched(vector_store, splits)
     
     return {
         "original_texts": len(texts),
@@ -1136,6 +1683,15 @@ def import_texts(texts: List[str], metadatas: Optional[List[dict]] = None, kb_id
     }
 
 
+async def aimport_texts(texts: List[str], metadatas: Optional[List[dict]] = None, kb_id: Optional[str] = None) -> dict:
+    """Async variant of import_texts; concurrent calls share embedding and upsert batches"""
+    documents = _texts_to_documents(texts, metadatas)
+    return {
+        "original_texts": len(texts),
+        "chunks_created": await _import_batcher.submit(documents, kb_id)
+    }
+
+
 def clear_knowledge_base(kb_id: Optional[str] = None) -> dict:
     """Clear all documents from the knowledge base"""
     client = get_qdrant_client()
@@ -1155,6 +1711,7 @@ def clear_knowledge_base(kb_id: Optional[str] = None) -> dict:
         # Reset global vector store to force re-creation
         global _vector_store
         _vector_store = None
+        clear_retrieval_cache()
         ensure_collection_exists(kb_id)
         return {"status": "success", "message": f"Collection '{collection_name}' cleared"}
     except Exception as e:
@@ -1163,6 +1720,10 @@ def clear_knowledge_base(kb_id: Optional[str] = None) -> dict:
 
 def get_kb_stats(kb_id: Optional[str] = None) -> dict:
     """Get statistics about the knowledge base"""
+    return _cached_kb_read(("stats", kb_id), lambda: _get_kb_stats_uncached(kb_id))
+
+
+def _get_kb_stats_uncached(kb_id: Optional[str]) -> dict:
     # Get collection name from KB or use default
     if kb_id:
         kb = get_kb_store().get_knowledge_base(kb_id)
@@ -1191,6 +1752,13 @@ def get_kb_stats(kb_id: Optional[str] = None) -> dict:
 
 def list_kb_documents(kb_id: Optional[str] = None, limit: int = 100, offset: int = 0) -> dict:
     """List documents in the knowledge base"""
+    return _cached_kb_read(
+        ("documents", kb_id, limit, offset),
+        lambda: _list_kb_documents_uncached(kb_id, limit, offset),
+    )
+
+
+def _list_kb_documents_uncached(kb_id: Optional[str], limit: int, offset: int) -> dict:
     # Get collection name from KB or use default
     if kb_id:
         kb = get_kb_store().get_knowledge_base(kb_id)
@@ -3,23 +3,28 @@ from __future__ import annotations
 
 import os
 import re
+import sys
+import time
 import uuid
+from functools import lru_cache
 from datetime import datetime
 from threading import Lock
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field, field_validator
-from sqlalchemy import select, delete, update
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from sqlalchemy import select, delete, func, update
 from sqlalchemy.orm import selectinload
 
 from server.server.database import (
     CustomModelDB,
     ModelVersionDB,
     ActiveModelDB,
+    ConfigGenerationDB,
     ToolDB,
     KnowledgeBaseDB,
     get_sync_session,
     init_db_sync,
+    to_iso_timestamp,
     db_model_to_dict,
     db_version_to_dict,
 )
@@ -29,6 +34,8 @@ BUILTIN_TOOL_NAMES = ["get_datetime", "search_knowledge_base"]
 
 # This will be dynamically populated with builtin + database tools
 AVAILABLE_TOOL_NAMES = BUILTIN_TOOL_NAMES.copy()
+# Set view of AVAILABLE_TOOL_NAMES for membership checks; kept in sync by ToolStore
+_AVAILABLE_TOOL_SET = frozenset(AVAILABLE_TOOL_NAMES)
 
 # Generate a consistent default model ID using hex format
 def _generate_hex_id() -> str:
@@ -41,16 +48,30 @@ DEFAULT_KB_ID = "e5f6a7b8"  # Fixed default KB ID in hex format
 
 # Whitelist of allowed model_params keys for safety
 ALLOWED_MODEL_PARAMS = ["temperature", "max_tokens", "top_p", "stop", "presence_penalty", "frequency_penalty"]
+_ALLOWED_MODEL_PARAMS_SET = frozenset(ALLOWED_MODEL_PARAMS)
 
-# Model name validation pattern: lowercase letters, numbers, underscore, hyphen
-MODEL_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_-]*$")
+# Seconds ConfigStore.epoch is reused before the model table is re-read. Writes made
+# through this process reset it immediately; other workers see them within the TTL.
+MODEL_EPOCH_TTL = float(os.getenv("MODEL_EPOCH_TTL", "1"))
+
+# Model name validation: lowercase letters, numbers, underscore, hyphen.
+# Checked with set membership instead of a regex since names are tiny.
+MODEL_NAME_FIRST_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz")
+MODEL_NAME_CHARS = MODEL_NAME_FIRST_CHARS | frozenset("0123456789_-")
 MODEL_NAME_MIN_LENGTH = 2
 MODEL_NAME_MAX_LENGTH = 64
 
-# Version validation pattern: semantic versioning (e.g., 1.0.0, 2.1.3)
-VERSION_PATTERN = re.compile(r"^\d+\.\d+\.\d+$")
+# Tool and knowledge base name validation, compiled once at import
+_NAME_RE = re.compile(r'^[a-z][a-z0-9_-]*$')
+
+# Version validation: semantic versioning (e.g., 1.0.0, 2.1.3)
+VERSION_PART_MAX_LENGTH = 9
+
+# The helpers below run for every model load and identifier resolution. They are
+# pure functions of short strings, so results are memoized; failures are not cached.
 
 
+@lru_cache(maxsize=4096)
 def validate_model_name(name: str) -> str:
     """Validate model name format.
     
@@ -70,7 +91,7 @@ def validate_model_name(name: str) -> str:
     if len(name) > MODEL_NAME_MAX_LENGTH:
         raise ValueError(f"Model name must be at most {MODEL_NAME_MAX_LENGTH} characters.")
     
-    if not MODEL_NAME_PATTERN.match(name):
+    if name[0] not in MODEL_NAME_FIRST_CHARS or not MODEL_NAME_CHARS.issuperset(name):
         raise ValueError(
             "Model name must start with a letter and contain only lowercase letters (a-z), "
             "numbers (0-9), underscores (_), and hyphens (-)."
@@ -79,19 +100,25 @@ def validate_model_name(name: str) -> str:
     return name
 
 
+@lru_cache(maxsize=4096)
 def validate_version(version: str) -> str:
     """Validate semantic version format (e.g., 1.0.0)."""
     if not version:
         raise ValueError("Version is required.")
     
     version = version.strip()
+    parts = version.split(".")
     
-    if not VERSION_PATTERN.match(version):
+    if len(parts) != 3 or not all(
+        part.isascii() and part.isdigit() and len(part) <= VERSION_PART_MAX_LENGTH
+        for part in parts
+    ):
         raise ValueError("Version must follow semantic versioning format (e.g., 1.0.0, 2.1.3).")
     
     return version
 
 
+@lru_cache(maxsize=4096)
 def parse_model_identifier(identifier: str) -> Tuple[str, Optional[str]]:
     """Parse a model identifier that may include a version.
     
@@ -101,12 +128,18 @@ def parse_model_identifier(identifier: str) -> Tuple[str, Optional[str]]:
     
     Returns (name, version) tuple.
     """
-    if "@" in identifier:
-        parts = identifier.split("@", 1)
-        return parts[0], parts[1]
+    name, sep, version = identifier.partition("@")
+    if sep:
+        return name, version
     return identifier, None
 
 
+@lru_cache(maxsize=4096)
+def _version_key(version: str) -> Tuple[int, ...]:
+    """Parse a semantic version into a sortable tuple, cached per version string."""
+    return tuple(int(x) for x in version.split("."))
+
+
 def compare_versions(v1: str, v2: str) -> int:
     """Compare two semantic versions.
     
@@ -115,28 +148,48 @@ def compare_versions(v1: str, v2: str) -> int:
     - 0 if v1 == v2
     - 1 if v1 > v2
     """
-    parts1 = [int(x) for x in v1.split(".")]
-    parts2 = [int(x) for x in v2.split(".")]
-    
-    for p1, p2 in zip(parts1, parts2):
-        if p1 < p2:
-            return -1
-        if p1 > p2:
-            return 1
-    return 0
+    key1 = _version_key(v1)
+    key2 = _version_key(v2)
+    return (key1 > key2) - (key1 < key2)
 
 
 class RagSettings(BaseModel):
     """RAG-specific settings that can vary per model."""
 
+    model_config = ConfigDict(extra="ignore", defer_build=False, validate_assignment=False)
+
     enabled: bool = Field(True)
     top_k: int = Field(3, ge=1)
     collection: str = Field(default_factory=lambda: os.getenv("QDRANT_COLLECTION", "knowledge_base"))
 
 
+# Built once at import so dict settings are validated without a per-call schema build
+_RAG_ADAPTER = TypeAdapter(RagSettings)
+
+
+def _dump_rag_settings(settings: Union[RagSettings, Dict[str, Any]]) -> Dict[str, Any]:
+    """Serialize RagSettings for a JSON column.
+    
+    The schema is fixed and flat, so this skips pydantic's generic serializer on the
+    write path. Keep in sync with the RagSettings fields. Plain dicts are validated
+    first so they cannot bypass the field constraints.
+    """
+    if not isinstance(settings, RagSettings):
+        settings = _RAG_ADAPTER.validate_python(settings)
+    return {
+        "enabled": settings.enabled,
+        "top_k": settings.top_k,
+        "collection": settings.collection,
+    }
+
+
 class ModelVersionConfig(BaseModel):
     """Configuration for a specific version of a model."""
     
+    model_config = ConfigDict(
+        extra="ignore", defer_build=False, validate_assignment=False, protected_namespaces=()
+    )
+    
     version: str = Field(..., description="Semantic version (e.g., 1.0.0)")
     enabled: bool = Field(default=True, description="Whether this version is enabled for use")
     rag_settings: RagSettings = Field(default_factory=RagSettings)
@@ -155,6 +208,10 @@ class ModelVersionConfig(BaseModel):
 class CustomModel(BaseModel):
     """Representation of a custom model configuration with version history."""
 
+    model_config = ConfigDict(
+        extra="ignore", defer_build=False, validate_assignment=False, protected_namespaces=()
+    )
+
     id: str
     name: str
     version: str = Field(default="1.0.0", description="Current/latest semantic version")
@@ -183,37 +240,50 @@ class CustomModel(BaseModel):
         return validate_model_name(v)
 
 
+# Built once at import so the core schema is not reconstructed per loaded model
+_MODEL_ADAPTER = TypeAdapter(CustomModel)
+
+
 def _db_to_pydantic_model(db_model: CustomModelDB) -> CustomModel:
     """Convert a database model to a Pydantic model."""
-    version_history = {}
-    for v in db_model.versions:
-        rag = v.rag_settings or {}
-        version_history[v.version] = ModelVersionConfig(
-            version=v.version,
-            enabled=v.enabled,
-            rag_settings=RagSettings(**rag) if rag else RagSettings(),
-            tool_names=v.tool_names or AVAILABLE_TOOL_NAMES.copy(),
-            base_model=v.base_model,
-            model_params=v.model_params or {},
-            created_at=v.created_at.isoformat() + "Z" if v.created_at else None,
-            description=v.description,
-        )
+    payload = db_model_to_dict(db_model)
     
-    rag_settings = db_model.rag_settings or {}
+    for entry in (payload, *payload["version_history"].values()):
+        # Empty tool lists fall back to all available tools
+        tool_names = entry["tool_names"] or AVAILABLE_TOOL_NAMES
+        # Tool and base model names repeat across every cached model and version;
+        # interning makes them share a single string object each
+        entry["tool_names"] = [sys.intern(name) for name in tool_names]
+        if entry["base_model"]:
+            entry["base_model"] = sys.intern(entry["base_model"])
     
-    return CustomModel(
-        id=db_model.id,
-        name=db_model.name,
+    return _MODEL_ADAPTER.validate_python(payload)
+
+
+def _bump_generation(session) -> None:
+    """Increment the config generation as part of the session's pending write.
+    
+    The row lock also orders concurrent writers, so the committed value always
+    moves forward with the data.
+    """
+    session.execute(
+        update(ConfigGenerationDB)
+        .where(ConfigGenerationDB.id == 1)
+        .values(value=ConfigGenerationDB.value + 1)
+    )
+
+
+def _current_version_db(db_model: CustomModelDB, created_at: datetime) -> ModelVersionDB:
+    """Build a version history row mirroring a model's current configuration."""
+    return ModelVersionDB(
+        model_id=db_model.id,
         version=db_model.version,
         enabled=db_model.enabled,
-        rag_settings=RagSettings(**rag_settings) if rag_settings else RagSettings(),
-        tool_names=db_model.tool_names or AVAILABLE_TOOL_NAMES.copy(),
+        rag_settings=db_model.rag_settings,
+        tool_names=db_model.tool_names,
         base_model=db_model.base_model,
-        model_params=db_model.model_params or {},
-        created_at=db_model.created_at.isoformat() + "Z" if db_model.created_at else None,
-        updated_at=db_model.updated_at.isoformat() + "Z" if db_model.updated_at else None,
-        version_history=version_history,
-        active_versions=db_model.active_versions or [],
+        model_params=db_model.model_params,
+        created_at=created_at,
     )
 
 
@@ -223,6 +293,13 @@ class ConfigStore:
     def __init__(self):
         self._lock = Lock()
         self._initialized = False
+        # Converted models by id, tagged with the row's updated_at. Every mutation
+        # bumps updated_at, so a matching stamp means the row has not changed.
+        # ToolStore clears it when the available tools change.
+        self._model_cache: Dict[str, Tuple[datetime, CustomModel]] = {}
+        # (expires_at, generation) for epoch, plus a count of writes made by this process
+        self._epoch: Optional[Tuple[float, int]] = None
+        self._local_writes = 0
         self._initialize()
 
     def _initialize(self) -> None:
@@ -243,11 +320,12 @@ class ConfigStore:
                 # Create default model
                 default_model = self._create_default_model_db(session)
                 session.add(default_model)
-                session.commit()
+                session.flush()
                 
-                # Set as active
+                # Set as active in the same transaction
                 active = ActiveModelDB(model_id=default_model.id, priority=0)
                 session.add(active)
+                _bump_generation(session)
                 session.commit()
             else:
                 # Ensure there's at least one active model
@@ -258,7 +336,23 @@ class ConfigStore:
                     # Get first model and make it active
                     active = ActiveModelDB(model_id=existing_model.id, priority=0)
                     session.add(active)
-                    session.commit()
+                
+                # Backfill a version row for models whose current version has none,
+                # so version lookups only need the version history
+                missing = session.execute(
+                    select(CustomModelDB)
+                    .outerjoin(
+                        ModelVersionDB,
+                        (ModelVersionDB.model_id == CustomModelDB.id)
+                        & (ModelVersionDB.version == CustomModelDB.version),
+                    )
+                    .where(ModelVersionDB.id.is_(None))
+                ).scalars().all()
+                for db_model in missing:
+                    session.add(_current_version_db(db_model, db_model.updated_at))
+                
+                _bump_generation(session)
+                session.commit()
         
         self._initialized = True
 
@@ -299,6 +393,35 @@ class ConfigStore:
         
         return db_model
 
+    def _to_cached_model(self, db_model: CustomModelDB) -> CustomModel:
+        """Convert a loaded row, reusing the cached model if the row is unchanged."""
+        cached = self._model_cache.get(db_model.id)
+        if cached and cached[0] == db_model.updated_at:
+            return cached[1]
+        model = _db_to_pydantic_model(db_model)
+        self._model_cache[db_model.id] = (db_model.updated_at, model)
+        return model
+
+    def _find_model(self, session, condition) -> Optional[CustomModel]:
+        """Load a single model, skipping the full load when the cached copy is current."""
+        stamp = session.execute(
+            select(CustomModelDB.id, CustomModelDB.updated_at).where(condition)
+        ).one_or_none()
+        if stamp is None:
+            return None
+        
+        model_id, updated_at = stamp
+        cached = self._model_cache.get(model_id)
+        if cached and cached[0] == updated_at:
+            return cached[1]
+        
+        db_model = session.execute(
+            select(CustomModelDB)
+            .options(selectinload(CustomModelDB.versions))
+            .where(CustomModelDB.id == model_id)
+        ).scalar_one_or_none()
+        return self._to_cached_model(db_model) if db_model else None
+
     def list_models(self) -> List[CustomModel]:
         """List all custom models."""
         with get_sync_session() as session:
@@ -306,33 +429,22 @@ class ConfigStore:
                 select(CustomModelDB).options(selectinload(CustomModelDB.versions))
             )
             db_models = result.scalars().all()
-            return [_db_to_pydantic_model(m) for m in db_models]
+            return [self._to_cached_model(m) for m in db_models]
 
     def get_model(self, model_id: str) -> Optional[CustomModel]:
-        """Get a model by ID."""
+        """Get a model by ID.
+        
+        Returned models may be shared with other callers and must not be mutated.
+        """
         with get_sync_session() as session:
-            result = session.execute(
-                select(CustomModelDB)
-                .options(selectinload(CustomModelDB.versions))
-                .where(CustomModelDB.id == model_id)
-            )
-            db_model = result.scalar_one_or_none()
-            if db_model:
-                return _db_to_pydantic_model(db_model)
-            return None
+            return self._find_model(session, CustomModelDB.id == model_id)
 
     def get_model_by_name(self, name: str) -> Optional[CustomModel]:
         """Find a custom model by its name (case-insensitive)."""
+        # Names are stored lowercased, so an equality match can use the unique
+        # index on name instead of an ILIKE scan (which also treats "_" as a wildcard)
         with get_sync_session() as session:
-            result = session.execute(
-                select(CustomModelDB)
-                .options(selectinload(CustomModelDB.versions))
-                .where(CustomModelDB.name.ilike(name))
-            )
-            db_model = result.scalar_one_or_none()
-            if db_model:
-                return _db_to_pydantic_model(db_model)
-            return None
+            return self._find_model(session, CustomModelDB.name == name.lower())
 
     def get_model_by_name_and_version(self, name: str, version: str) -> Optional[Tuple[CustomModel, ModelVersionConfig]]:
         """Find a custom model and its specific version config."""
@@ -340,22 +452,11 @@ class ConfigStore:
         if not model:
             return None
         
-        if version in model.version_history:
-            return (model, model.version_history[version])
-        
-        if version == model.version:
-            config = ModelVersionConfig(
-                version=model.version,
-                enabled=model.enabled,
-                rag_settings=model.rag_settings,
-                tool_names=model.tool_names,
-                base_model=model.base_model,
-                model_params=model.model_params,
-                created_at=model.created_at,
-            )
-            return (model, config)
-        
-        return None
+        # The current version always has a history entry (see _current_version_db)
+        config = model.version_history.get(version)
+        if config is None:
+            return None
+        return (model, config)
 
     def resolve_model_identifier(self, identifier: str) -> Optional[Tuple[CustomModel, Optional[ModelVersionConfig]]]:
         """Resolve a model identifier (with optional version) to model and version config."""
@@ -363,7 +464,7 @@ class ConfigStore:
         model = self.get_model_by_name(name)
         
         if not model:
-            model = self.get_model(identifier.split("@")[0] if "@" in identifier else identifier)
+            model = self.get_model(name)
             if not model:
                 return None
         
@@ -375,28 +476,53 @@ class ConfigStore:
         
         return (model, None)
 
+    def _invalidate_epoch(self) -> None:
+        """Make the next epoch read reflect a write made by this process."""
+        self._local_writes += 1
+        self._epoch = None
+
+    @property
+    def epoch(self) -> int:
+        """Model config generation, which every model write increments in its own transaction.
+        
+        The counter is read at most once per MODEL_EPOCH_TTL seconds; local writes
+        are seen immediately.
+        """
+        cached = self._epoch
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        writes = self._local_writes
+        with get_sync_session() as session:
+            epoch = session.execute(
+                select(ConfigGenerationDB.value).where(ConfigGenerationDB.id == 1)
+            ).scalar_one()
+        # A write that landed during the read may not be in the result; don't keep it
+        if writes == self._local_writes:
+            self._epoch = (time.monotonic() + MODEL_EPOCH_TTL, epoch)
+        return epoch
+
     @property
     def active_model_ids(self) -> List[str]:
-        """Get list of active model IDs ordered by priority."""
+        """Get list of active model IDs ordered by priority.
+        
+        At least one entry is guaranteed by _initialize, remove_active_model and
+        delete_model, so no fallback is needed here.
+        """
         with get_sync_session() as session:
             result = session.execute(
                 select(ActiveModelDB.model_id).order_by(ActiveModelDB.priority)
             )
-            ids = [row[0] for row in result.fetchall()]
-            
-            if not ids:
-                # Fallback: get first available model
-                model_result = session.execute(select(CustomModelDB.id).limit(1))
-                first_model = model_result.scalar_one_or_none()
-                if first_model:
-                    return [first_model]
-            return ids
+            return list(result.scalars())
 
     @property
     def active_model_id(self) -> str:
         """Get the primary active model ID."""
-        ids = self.active_model_ids
-        return ids[0] if ids else DEFAULT_MODEL_ID
+        with get_sync_session() as session:
+            model_id = session.execute(
+                select(ActiveModelDB.model_id).order_by(ActiveModelDB.priority).limit(1)
+            ).scalar_one_or_none()
+        return model_id or DEFAULT_MODEL_ID
 
     def get_active_model(self) -> CustomModel:
         """Get the primary active model."""
@@ -430,14 +556,16 @@ class ConfigStore:
                 raise ValueError(f"A model with name '{validated_name}' already exists.")
             
             tool_list = tool_names if tool_names is not None else AVAILABLE_TOOL_NAMES.copy()
-            validated_tools = [tool for tool in tool_list if tool in AVAILABLE_TOOL_NAMES]
+            validated_tools = [tool for tool in tool_list if tool in _AVAILABLE_TOOL_SET]
             if not validated_tools:
                 raise ValueError("At least one valid tool name is required.")
             
             settings = rag_settings or RagSettings()
+            # Dumped once and shared by the model row and its initial version row
+            rag_payload = _dump_rag_settings(settings)
             safe_params = {}
             if model_params:
-                safe_params = {k: v for k, v in model_params.items() if k in ALLOWED_MODEL_PARAMS}
+                safe_params = {k: v for k, v in model_params.items() if k in _ALLOWED_MODEL_PARAMS_SET}
             
             now = datetime.utcnow()
             model_id = uuid.uuid4().hex[:8]
@@ -448,7 +576,7 @@ class ConfigStore:
                     name=validated_name,
                     version=validated_version,
                     enabled=enabled,
-                    rag_settings=settings.model_dump(),
+                    rag_settings=rag_payload,
                     tool_names=validated_tools,
                     base_model=base_model,
                     model_params=safe_params,
@@ -461,7 +589,7 @@ class ConfigStore:
                     model_id=model_id,
                     version=validated_version,
                     enabled=enabled,
-                    rag_settings=settings.model_dump(),
+                    rag_settings=rag_payload,
                     tool_names=validated_tools,
                     base_model=base_model,
                     model_params=safe_params,
@@ -471,10 +599,12 @@ class ConfigStore:
                 
                 session.add(db_model)
                 session.add(version_db)
+                _bump_generation(session)
                 session.commit()
-                session.refresh(db_model)
-            
-            return self.get_model(model_id)
+                self._invalidate_epoch()
+        
+        # Read back outside the lock so concurrent callers are not held up
+        return self.get_model(model_id)
 
     def create_model_version(
         self,
@@ -504,16 +634,17 @@ class ConfigStore:
             now = datetime.utcnow()
             
             tool_list = tool_names if tool_names is not None else model.tool_names
-            validated_tools = [tool for tool in tool_list if tool in AVAILABLE_TOOL_NAMES]
+            validated_tools = [tool for tool in tool_list if tool in _AVAILABLE_TOOL_SET]
             if not validated_tools:
                 raise ValueError("At least one valid tool name is required.")
             
             settings = rag_settings if rag_settings is not None else model.rag_settings
+            rag_payload = _dump_rag_settings(settings)
             base = base_model if base_model is not None else model.base_model
             
             safe_params = {}
             if model_params is not None:
-                safe_params = {k: v for k, v in model_params.items() if k in ALLOWED_MODEL_PARAMS}
+                safe_params = {k: v for k, v in model_params.items() if k in _ALLOWED_MODEL_PARAMS_SET}
             else:
                 safe_params = model.model_params.copy()
             
@@ -523,7 +654,7 @@ class ConfigStore:
                     model_id=model_id,
                     version=validated_version,
                     enabled=enabled,
-                    rag_settings=settings.model_dump() if isinstance(settings, RagSettings) else settings,
+                    rag_settings=rag_payload,
                     tool_names=validated_tools,
                     base_model=base,
                     model_params=safe_params,
@@ -543,17 +674,19 @@ class ConfigStore:
                 
                 db_model.version = validated_version
                 db_model.enabled = enabled
-                db_model.rag_settings = settings.model_dump() if isinstance(settings, RagSettings) else settings
+                db_model.rag_settings = rag_payload
                 db_model.tool_names = validated_tools
                 db_model.base_model = base
                 db_model.model_params = safe_params
                 db_model.active_versions = active_versions
                 db_model.updated_at = now
                 
+                _bump_generation(session)
                 session.commit()
-            
-            updated_model = self.get_model(model_id)
-            return (updated_model, updated_model.version_history[validated_version])
+                self._invalidate_epoch()
+        
+        updated_model = self.get_model(model_id)
+        return (updated_model, updated_model.version_history[validated_version])
 
     def get_version_history(self, model_id: str) -> List[ModelVersionConfig]:
         """Get all versions for a model, sorted by version (newest first)."""
@@ -562,7 +695,7 @@ class ConfigStore:
             raise KeyError(f"Model '{model_id}' does not exist.")
         
         versions = list(model.version_history.values())
-        versions.sort(key=lambda v: [int(x) for x in v.version.split(".")], reverse=True)
+        versions.sort(key=lambda v: _version_key(v.version), reverse=True)
         
         return versions
 
@@ -600,7 +733,8 @@ class ConfigStore:
                 if validated_version not in active_versions:
                     active_versions.append(validated_version)
                     db_model.active_versions = active_versions
-                    db_model.updated_at = datetime.utcnow()
+                # Always bump: the version row changes even if active_versions does not
+                db_model.updated_at = datetime.utcnow()
                 
                 # Update version enabled status
                 version_db = session.execute(
@@ -610,10 +744,12 @@ class ConfigStore:
                 ).scalar_one()
                 version_db.enabled = True
                 
+                _bump_generation(session)
                 session.commit()
-            
-            updated_model = self.get_model(model_id)
-            return (updated_model, updated_model.version_history[validated_version])
+                self._invalidate_epoch()
+        
+        updated_model = self.get_model(model_id)
+        return (updated_model, updated_model.version_history[validated_version])
 
     def deactivate_model_version(self, model_id: str, version: str) -> Tuple[CustomModel, ModelVersionConfig]:
         """Deactivate a specific version (clients can't use it)."""
@@ -639,7 +775,7 @@ class ConfigStore:
                 if validated_version in active_versions:
                     active_versions.remove(validated_version)
                     db_model.active_versions = active_versions
-                    db_model.updated_at = datetime.utcnow()
+                db_model.updated_at = datetime.utcnow()
                 
                 # Update version enabled status
                 version_db = session.execute(
@@ -649,10 +785,12 @@ class ConfigStore:
                 ).scalar_one()
                 version_db.enabled = False
                 
+                _bump_generation(session)
                 session.commit()
-            
-            updated_model = self.get_model(model_id)
-            return (updated_model, updated_model.version_history[validated_version])
+                self._invalidate_epoch()
+        
+        updated_model = self.get_model(model_id)
+        return (updated_model, updated_model.version_history[validated_version])
 
     def is_version_active(self, model_id: str, version: str) -> bool:
         """Check if a specific version is active for client use."""
@@ -669,26 +807,22 @@ class ConfigStore:
                 raise KeyError(f"Model '{model_id}' does not exist.")
             
             with get_sync_session() as session:
-                # Check if already active
-                existing = session.execute(
-                    select(ActiveModelDB).where(ActiveModelDB.model_id == model_id)
-                ).scalar_one_or_none()
-                
-                if existing:
-                    # Move to highest priority
-                    session.execute(delete(ActiveModelDB).where(ActiveModelDB.model_id == model_id))
-                    session.commit()
+                # Drop any existing entry so the model moves to highest priority;
+                # delete and re-insert are committed as a single transaction
+                session.execute(delete(ActiveModelDB).where(ActiveModelDB.model_id == model_id))
                 
                 # Get lowest priority number and subtract 1
                 min_priority = session.execute(
-                    select(ActiveModelDB.priority).order_by(ActiveModelDB.priority).limit(1)
-                ).scalar_one_or_none()
+                    select(func.min(ActiveModelDB.priority))
+                ).scalar_one()
                 
                 new_priority = (min_priority - 1) if min_priority is not None else 0
                 
                 active = ActiveModelDB(model_id=model_id, priority=new_priority)
                 session.add(active)
+                _bump_generation(session)
                 session.commit()
+                self._invalidate_epoch()
             
             return model
 
@@ -701,19 +835,21 @@ class ConfigStore:
             
             with get_sync_session() as session:
                 existing = session.execute(
-                    select(ActiveModelDB).where(ActiveModelDB.model_id == model_id)
+                    select(ActiveModelDB.id).where(ActiveModelDB.model_id == model_id)
                 ).scalar_one_or_none()
                 
                 if not existing:
                     raise ValueError(f"Model '{model_id}' is not active.")
                 
                 # Check if it's the only active model
-                count = session.execute(select(ActiveModelDB)).scalars().all()
-                if len(count) == 1:
+                count = session.execute(select(func.count(ActiveModelDB.id))).scalar_one()
+                if count == 1:
                     raise ValueError("At least one active model must remain.")
                 
                 session.execute(delete(ActiveModelDB).where(ActiveModelDB.model_id == model_id))
+                _bump_generation(session)
                 session.commit()
+                self._invalidate_epoch()
             
             return model
 
@@ -741,37 +877,46 @@ class ConfigStore:
                 
                 if name is not None:
                     validated_name = validate_model_name(name)
-                    # Check for duplicate names (excluding current model)
-                    existing = session.execute(
-                        select(CustomModelDB)
-                        .where(CustomModelDB.name.ilike(validated_name))
-                        .where(CustomModelDB.id != model_id)
-                    ).scalar_one_or_none()
-                    if existing:
-                        raise ValueError(f"A model with name '{validated_name}' already exists.")
-                    db_model.name = validated_name
+                    if validated_name != db_model.name:
+                        # Check for duplicate names via the unique name index
+                        existing = session.execute(
+                            select(CustomModelDB.id).where(CustomModelDB.name == validated_name)
+                        ).scalar_one_or_none()
+                        if existing:
+                            raise ValueError(f"A model with name '{validated_name}' already exists.")
+                        db_model.name = validated_name
                 
                 if version is not None:
                     db_model.version = validate_version(version)
+                    new_version = db_model.version not in model.version_history
+                else:
+                    new_version = False
                 if enabled is not None:
                     db_model.enabled = enabled
                 if rag_settings is not None:
-                    db_model.rag_settings = rag_settings.model_dump()
+                    db_model.rag_settings = _dump_rag_settings(rag_settings)
                 if tool_names is not None:
-                    validated_tools = [t for t in tool_names if t in AVAILABLE_TOOL_NAMES]
+                    validated_tools = [t for t in tool_names if t in _AVAILABLE_TOOL_SET]
                     if not validated_tools:
                         raise ValueError("At least one valid tool name is required.")
                     db_model.tool_names = validated_tools
                 if base_model is not None:
                     db_model.base_model = base_model if base_model else None
                 if model_params is not None:
-                    safe_params = {k: v for k, v in model_params.items() if k in ALLOWED_MODEL_PARAMS}
+                    safe_params = {k: v for k, v in model_params.items() if k in _ALLOWED_MODEL_PARAMS_SET}
                     db_model.model_params = safe_params
                 
                 db_model.updated_at = datetime.utcnow()
+                
+                # Record the new current version so it resolves as name@version
+                if new_version:
+                    session.add(_current_version_db(db_model, db_model.updated_at))
+                
+                _bump_generation(session)
                 session.commit()
-            
-            return self.get_model(model_id)
+                self._invalidate_epoch()
+        
+        return self.get_model(model_id)
 
     def delete_model(self, model_id: str) -> None:
         """Delete a model by ID. Cannot delete the only active model."""
@@ -783,11 +928,11 @@ class ConfigStore:
             with get_sync_session() as session:
                 # Check if it's the only active model
                 active = session.execute(
-                    select(ActiveModelDB).where(ActiveModelDB.model_id == model_id)
+                    select(ActiveModelDB.id).where(ActiveModelDB.model_id == model_id)
                 ).scalar_one_or_none()
                 
                 if active:
-                    count = len(session.execute(select(ActiveModelDB)).scalars().all())
+                    count = session.execute(select(func.count(ActiveModelDB.id))).scalar_one()
                     if count == 1:
                         raise ValueError("Cannot delete the only active model. Activate another model first.")
                     # Remove from active models
@@ -795,18 +940,26 @@ class ConfigStore:
                 
                 # Delete the model (versions cascade)
                 session.execute(delete(CustomModelDB).where(CustomModelDB.id == model_id))
+                _bump_generation(session)
                 session.commit()
+                self._invalidate_epoch()
+            
+            self._model_cache.pop(model_id, None)
 
 
-# Global config store instance
+# Global config store instance, created on first use
 _config_store: Optional[ConfigStore] = None
+_config_store_lock = Lock()
 
 
 def get_config_store() -> ConfigStore:
     """Get or create the global config store."""
     global _config_store
     if _config_store is None:
-        _config_store = ConfigStore()
+        # Handlers may run in worker threads; only one of them should initialize the store
+        with _config_store_lock:
+            if _config_store is None:
+                _config_store = ConfigStore()
     return _config_store
 
 
@@ -891,6 +1044,7 @@ class ToolStore:
 
     def _sync_builtin_tools(self) -> None:
         """Ensure builtin tools exist in database with correct hex IDs."""
+        now = datetime.utcnow()
         with get_sync_session() as session:
             for tool_name, tool_def in BUILTIN_TOOLS.items():
                 existing = session.execute(
@@ -906,21 +1060,25 @@ class ToolStore:
                         category=tool_def.category,
                         enabled=tool_def.enabled,
                         config={"is_builtin": True},
-                        created_at=datetime.utcnow(),
-                        updated_at=datetime.utcnow(),
+                        created_at=now,
+                        updated_at=now,
                     )
                     session.add(db_tool)
                 elif existing.id != tool_def.id:
                     # Update existing tool to use new hex ID
                     existing.id = tool_def.id
-                    existing.updated_at = datetime.utcnow()
+                    existing.updated_at = now
             session.commit()
 
     def _update_available_tools(self) -> None:
         """Update AVAILABLE_TOOL_NAMES with all enabled tools from database."""
-        global AVAILABLE_TOOL_NAMES
+        global AVAILABLE_TOOL_NAMES, _AVAILABLE_TOOL_SET
         tools = self.list_tools()
         AVAILABLE_TOOL_NAMES = [t.name for t in tools if t.enabled]
+        _AVAILABLE_TOOL_SET = frozenset(AVAILABLE_TOOL_NAMES)
+        # Cached models resolved empty tool lists against the previous tool set
+        if _config_store is not None:
+            _config_store._model_cache.clear()
 
     def list_tools(self) -> List[Tool]:
         """List all tools (builtin + custom)."""
@@ -955,7 +1113,7 @@ class ToolStore:
         """Create a new custom tool."""
         with self._lock:
             # Validate name
-            if not name or not re.match(r'^[a-z][a-z0-9_-]*$', name):
+            if not name or not _NAME_RE.match(name):
                 raise ValueError(
                     "Tool name must start with a letter and contain only lowercase letters, "
                     "numbers, underscores, and hyphens."
@@ -1021,7 +1179,7 @@ class ToolStore:
                 raise ValueError("Cannot modify function code of builtin tools.")
             
             # Validate new name if provided
-            if name and not re.match(r'^[a-z][a-z0-9_-]*$', name):
+            if name and not _NAME_RE.match(name):
                 raise ValueError(
                     "Tool name must start with a letter and contain only lowercase letters, "
                     "numbers, underscores, and hyphens."
@@ -1112,8 +1270,8 @@ class ToolStore:
             is_builtin=config.get("is_builtin", False),
             function_code=db_tool.function_code,
             parameters=params,
-            created_at=db_tool.created_at.isoformat() + "Z" if db_tool.created_at else None,
-            updated_at=db_tool.updated_at.isoformat() + "Z" if db_tool.updated_at else None,
+            created_at=to_iso_timestamp(db_tool.created_at),
+            updated_at=to_iso_timestamp(db_tool.updated_at),
         )
 
     def _validate_function_code(self, code: str, tool_name: str) -> None:
@@ -1153,13 +1311,16 @@ class ToolStore:
 
 # Global tool store instance
 _tool_store: Optional[ToolStore] = None
+_tool_store_lock = Lock()
 
 
 def get_tool_store() -> ToolStore:
     """Get or create the global tool store."""
     global _tool_store
     if _tool_store is None:
-        _tool_store = ToolStore()
+        with _tool_store_lock:
+            if _tool_store is None:
+                _tool_store = ToolStore()
     return _tool_store
 
 
@@ -1257,7 +1418,7 @@ class KnowledgeBaseStore:
         """Create a new knowledge base."""
         with self._lock:
             # Validate name
-            if not name or not re.match(r'^[a-z][a-z0-9_-]*$', name):
+            if not name or not _NAME_RE.match(name):
                 raise ValueError(
                     "Knowledge base name must start with a letter and contain only lowercase letters, "
                     "numbers, underscores, and hyphens."
@@ -1314,7 +1475,7 @@ class KnowledgeBaseStore:
                 raise KeyError(f"Knowledge base '{kb_id}' not found.")
             
             # Validate new name if provided
-            if name and not re.match(r'^[a-z][a-z0-9_-]*$', name):
+            if name and not _NAME_RE.match(name):
                 raise ValueError(
                     "Knowledge base name must start with a letter and contain only lowercase letters, "
                     "numbers, underscores, and hyphens."
@@ -1379,18 +1540,21 @@ class KnowledgeBaseStore:
             description=db_kb.description,
             collection=db_kb.collection,
             embedding_model=db_kb.embedding_model,
-            created_at=db_kb.created_at.isoformat() + "Z" if db_kb.created_at else None,
-            updated_at=db_kb.updated_at.isoformat() + "Z" if db_kb.updated_at else None,
+            created_at=to_iso_timestamp(db_kb.created_at),
+            updated_at=to_iso_timestamp(db_kb.updated_at),
         )
 
 
 # Global knowledge base store instance
 _kb_store: Optional[KnowledgeBaseStore] = None
+_kb_store_lock = Lock()
 
 
 def get_kb_store() -> KnowledgeBaseStore:
     """Get or create the global knowledge base store."""
     global _kb_store
     if _kb_store is None:
-        _kb_store = KnowledgeBaseStore()
+        with _kb_store_lock:
+            if _kb_store is None:
+                _kb_store = KnowledgeBaseStore()
     return _kb_store
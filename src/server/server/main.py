@@ -1,21 +1,26 @@
 """FastAPI server with OpenAI-compatible API endpoints"""
 import os
-import uuid
 import time
-import re
-import json
 import asyncio
 import logging
+import queue
 from datetime import datetime
-from typing import Optional, List, AsyncGenerator, Any, Dict
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from typing import Optional, List, AsyncGenerator, Any, Collection, Container, Dict, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from functools import lru_cache, partial
 
 from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from dotenv import load_dotenv
+import anyio.to_thread
 import httpx
+import orjson
 import requests
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AIMessageChunk
 
@@ -24,6 +29,8 @@ load_dotenv()
 
 # Set up logging
 import os
+log_listener: Optional[QueueListener] = None
+log_file_buffer: Optional[MemoryHandler] = None
 try:
     # Create logs directory if it doesn't exist
     os.makedirs('/app/logs', exist_ok=True)
@@ -45,9 +52,15 @@ try:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Records are queued by the calling thread and written by a listener thread,
+    # so request handlers never block on log I/O
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    # File writes are batched: up to 200 records, flushed early on errors and by a lifespan task
+    log_file_buffer = MemoryHandler(capacity=200, flushLevel=logging.ERROR, target=file_handler)
+    log_file_buffer.setLevel(logging.INFO)
+    log_listener = QueueListener(log_queue, log_file_buffer, console_handler, respect_handler_level=True)
+    log_listener.start()
     
     # Test the logger
     logger.info("Logging system initialized successfully")
@@ -57,10 +70,15 @@ except Exception as e:
     import traceback
     traceback.print_exc()
 
-# Set up LangSmith tracing
-os.environ["LANGCHAIN_TRACING_V2"] = os.getenv("LANGSMITH_TRACING", "true")
-os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGSMITH_PROJECT", "open-chat-model")
-os.environ["LANGCHAIN_API_KEY"] = os.getenv("LANGSMITH_API_KEY", "")
+# Set up LangSmith tracing; without an API key it is switched off entirely so
+# graph runs do not build trace payloads that can never be sent
+if os.getenv("LANGSMITH_API_KEY"):
+    os.environ["LANGCHAIN_TRACING_V2"] = os.getenv("LANGSMITH_TRACING", "true")
+    os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGSMITH_PROJECT", "open-chat-model")
+    os.environ["LANGCHAIN_API_KEY"] = os.environ["LANGSMITH_API_KEY"]
+else:
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    os.environ["LANGSMITH_TRACING"] = "false"
 
 DEFAULT_MODEL = os.getenv("OLLAMA_API_MODEL", "gpt-oss:20b-cloud")
 
@@ -75,21 +93,56 @@ from server.core.graph import (
     list_kb_documents,
     is_rag_enabled,
     reload_knowledge_base,
-    retrieve_relevant_context,
+    aretrieve_relevant_context,
+    aretrieve_relevant_contexts,
     format_context,
-    import_texts,
-    import_documents,
+    aimport_texts,
+    aimport_documents,
     clear_knowledge_base,
+    warm_up,
+    get_llm_async_http_client,
+    aclose_llm_http_clients,
 )
 from langchain_core.documents import Document
 
 
+# Worker threads for blocking calls (graph runs, vector store and database access)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "200"))
+
+
+# Wall-clock seconds for "created" fields, refreshed once a second by a lifespan task
+_NOW = [int(time.time())]
+
+
+async def _tick_clock():
+    while True:
+        _NOW[0] = int(time.time())
+        await asyncio.sleep(1)
+
+
+async def _flush_log_file(interval: float = 0.5):
+    """Write buffered log records to the log file every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(log_file_buffer.flush)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown"""
     logger.info("Starting LangGraph Proxy Server...")
-    logger.info(f"Using model: {DEFAULT_MODEL}")
-    logger.info(f"LangSmith Project: {os.getenv('LANGSMITH_PROJECT')}")
+    
+    # Sync routes run on anyio's pool and asyncio.to_thread on the loop's executor; size both
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREADPOOL_SIZE))
+    # Created here rather than at import: before Python 3.10 a Semaphore binds to the
+    # loop current at construction, which is not the loop uvicorn serves on
+    app.state.llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM)
+    logger.info("Using model: %s", DEFAULT_MODEL)
+    if os.environ["LANGCHAIN_TRACING_V2"] == "true":
+        logger.info("LangSmith Project: %s", os.environ["LANGCHAIN_PROJECT"])
+    else:
+        logger.info("LangSmith tracing disabled.")
     
     # Initialize PostgreSQL database
     logger.info("Initializing PostgreSQL database...")
@@ -100,25 +153,45 @@ async def lifespan(app: FastAPI):
         # Initialize config store (creates default model if needed)
         store = get_config_store()
         active_model = store.get_active_model()
-        logger.info(f"Active model: {active_model.name} (v{active_model.version})")
+        logger.info("Active model: %s (v%s)", active_model.name, active_model.version)
         
         # Initialize tool store (syncs builtin tools to database)
         tool_store = get_tool_store()
         tools = tool_store.list_tools()
-        logger.info(f"Available tools: {len(tools)} ({len([t for t in tools if t.is_builtin])} builtin)")
+        builtin_count = sum(1 for t in tools if t.is_builtin)
+        logger.info("Available tools: %d (%d builtin)", len(tools), builtin_count)
     except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
+        logger.error("Database initialization failed: %s", e)
         logger.warning("The server will continue but some features may not work correctly.")
     
     # Initialize RAG
     if is_rag_enabled():
-        kb_stats = get_kb_stats()
-        logger.info(f"RAG enabled with {kb_stats.get('document_count', 0)} documents")
+        kb_stats = await asyncio.to_thread(get_kb_stats)
+        logger.info("RAG enabled with %s documents", kb_stats.get("document_count", 0))
     else:
         logger.info("RAG is disabled according to the active custom model configuration.")
     
+    # Open upstream connections now rather than on the first request
+    try:
+        await asyncio.to_thread(warm_up)
+        logger.info("LLM, embeddings and vector store clients warmed up.")
+    except Exception as e:
+        logger.warning("Warm-up failed, clients will be created on first use: %s", e)
+    
+    clock_task = asyncio.create_task(_tick_clock())
+    log_flush_task = asyncio.create_task(_flush_log_file()) if log_file_buffer is not None else None
+    
     yield
     logger.info("Shutting down LangGraph Proxy Server...")
+    clock_task.cancel()
+    await aclose_llm_http_clients()
+    if log_flush_task is not None:
+        log_flush_task.cancel()
+    if log_listener is not None:
+        # Drains the queue before returning
+        log_listener.stop()
+    if log_file_buffer is not None:
+        log_file_buffer.flush()
 
 
 app = FastAPI(
@@ -126,25 +199,59 @@ app = FastAPI(
     description="OpenAI-compatible API server using LangGraph with Ollama",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Add CORS middleware
+
+class _GZipExceptChatMiddleware(GZipMiddleware):
+    """GZip responses except chat completions, whose SSE token stream must not be held back."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/v1/chat/completions":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress larger JSON responses such as the admin model and log listings
+app.add_middleware(_GZipExceptChatMiddleware, minimum_size=1024, compresslevel=5)
+
+
+def _csv_env(name: str, default: str) -> List[str]:
+    """Read a comma-separated list from the environment."""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+# Add CORS middleware. Request headers stay open by default: tools receive any X-*
+# header and browser OpenAI SDKs send X-Stainless-* headers; set CORS_ALLOW_HEADERS
+# to an explicit list to check preflights by set membership instead
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=_csv_env("CORS_ORIGINS", "*"),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=_csv_env("CORS_ALLOW_HEADERS", "*"),
+    # Let browsers reuse a preflight for up to two hours (Chromium's cap)
+    max_age=int(os.getenv("CORS_MAX_AGE", "7200")),
 )
 
 
 # OpenAI-compatible models
+# Request bodies on the hot paths drop unknown fields (e.g. OpenAI options the proxy
+# does not use) during validation
+_REQUEST_MODEL_CONFIG = ConfigDict(extra="ignore")
+
+
 class ChatMessage(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+    
     role: str
     content: str
 
 
 class ChatCompletionRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+    
     model: str = Field(default=DEFAULT_MODEL)
     messages: List[ChatMessage]
     temperature: Optional[float] = 0.7
@@ -293,6 +400,8 @@ class ToolUpdateRequest(BaseModel):
 
 
 class ToolParameterResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     name: str
     type: str
     description: str
@@ -301,6 +410,8 @@ class ToolParameterResponse(BaseModel):
 
 
 class ToolResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     name: str
     description: str
@@ -332,6 +443,8 @@ class KnowledgeBaseUpdateRequest(BaseModel):
 
 
 class KnowledgeBaseResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     name: str
     description: Optional[str]
@@ -341,9 +454,31 @@ class KnowledgeBaseResponse(BaseModel):
     updated_at: Optional[str] = None
 
 
-def _build_model_response(model: CustomModel, active_model_ids: list[str]) -> CustomModelResponse:
-    active_set = set(active_model_ids)
-    return CustomModelResponse(
+# Serializers for the admin list endpoints, built once at import
+_MODEL_LIST_ADAPTER = TypeAdapter(List[CustomModelResponse])
+_VERSION_LIST_ADAPTER = TypeAdapter(List[VersionResponse])
+_TOOL_LIST_ADAPTER = TypeAdapter(List[ToolResponse])
+_KB_LIST_ADAPTER = TypeAdapter(List[KnowledgeBaseResponse])
+
+
+def _json_list_response(adapter: TypeAdapter, items: list) -> Response:
+    """Serialize response models straight to JSON bytes in one pydantic-core pass.
+    
+    Returning a Response makes FastAPI skip its response_model validation and
+    encoding; the decorators keep response_model for the OpenAPI schema.
+    """
+    return Response(content=adapter.dump_json(items), media_type="application/json")
+
+
+def _json_model_response(item: BaseModel) -> Response:
+    """Single-model counterpart of _json_list_response for read endpoints."""
+    return Response(content=item.model_dump_json(), media_type="application/json")
+
+
+def _build_model_response(model: CustomModel, active_model_ids: Collection[str]) -> CustomModelResponse:
+    """Build the admin response for a model; pass a frozenset when building many responses."""
+    # Fields come from an already validated CustomModel, so validation is skipped
+    return CustomModelResponse.model_construct(
         id=model.id,
         name=model.name,
         version=model.version,
@@ -352,7 +487,7 @@ def _build_model_response(model: CustomModel, active_model_ids: list[str]) -> Cu
         tool_names=model.tool_names,
         base_model=model.base_model,
         model_params=model.model_params,
-        active=model.id in active_set,
+        active=model.id in active_model_ids,
         created_at=model.created_at,
         updated_at=model.updated_at,
         active_versions=model.active_versions,
@@ -360,8 +495,8 @@ def _build_model_response(model: CustomModel, active_model_ids: list[str]) -> Cu
     )
 
 
-def _build_version_response(version_config: ModelVersionConfig, active_versions: List[str]) -> VersionResponse:
-    return VersionResponse(
+def _build_version_response(version_config: ModelVersionConfig, active_versions: Container[str]) -> VersionResponse:
+    return VersionResponse.model_construct(
         version=version_config.version,
         enabled=version_config.enabled,
         rag_settings=version_config.rag_settings,
@@ -389,26 +524,18 @@ async def health():
 # ========== KNOWLEDGE BASE MANAGEMENT ENDPOINTS ==========
 
 @app.get("/v1/admin/knowledge-bases", response_model=List[KnowledgeBaseResponse])
-async def list_admin_knowledge_bases():
+def list_admin_knowledge_bases():
     """List all knowledge bases"""
     kb_store = get_kb_store()
     kbs = kb_store.list_knowledge_bases()
-    return [
-        KnowledgeBaseResponse(
-            id=kb.id,
-            name=kb.name,
-            description=kb.description,
-            collection=kb.collection,
-            embedding_model=kb.embedding_model,
-            created_at=kb.created_at,
-            updated_at=kb.updated_at
-        )
+    return _json_list_response(_KB_LIST_ADAPTER, [
+        KnowledgeBaseResponse.model_validate(kb)
         for kb in kbs
-    ]
+    ])
 
 
 @app.post("/v1/admin/knowledge-bases", response_model=KnowledgeBaseResponse, status_code=201)
-async def create_admin_knowledge_base(request: KnowledgeBaseCreateRequest):
+def create_admin_knowledge_base(request: KnowledgeBaseCreateRequest):
     """Create a new knowledge base"""
     kb_store = get_kb_store()
     try:
@@ -418,40 +545,24 @@ async def create_admin_knowledge_base(request: KnowledgeBaseCreateRequest):
             collection=request.collection,
             embedding_model=request.embedding_model,
         )
-        return KnowledgeBaseResponse(
-            id=kb.id,
-            name=kb.name,
-            description=kb.description,
-            collection=kb.collection,
-            embedding_model=kb.embedding_model,
-            created_at=kb.created_at,
-            updated_at=kb.updated_at
-        )
+        return KnowledgeBaseResponse.model_validate(kb)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
 @app.get("/v1/admin/knowledge-bases/{kb_id}", response_model=KnowledgeBaseResponse)
-async def get_admin_knowledge_base(kb_id: str):
+def get_admin_knowledge_base(kb_id: str):
     """Get a knowledge base by ID"""
     kb_store = get_kb_store()
     kb = kb_store.get_knowledge_base(kb_id)
     if not kb:
         raise HTTPException(status_code=404, detail=f"Knowledge base '{kb_id}' not found")
     
-    return KnowledgeBaseResponse(
-        id=kb.id,
-        name=kb.name,
-        description=kb.description,
-        collection=kb.collection,
-        embedding_model=kb.embedding_model,
-        created_at=kb.created_at,
-        updated_at=kb.updated_at
-    )
+    return _json_model_response(KnowledgeBaseResponse.model_validate(kb))
 
 
 @app.put("/v1/admin/knowledge-bases/{kb_id}", response_model=KnowledgeBaseResponse)
-async def update_admin_knowledge_base(kb_id: str, request: KnowledgeBaseUpdateRequest):
+def update_admin_knowledge_base(kb_id: str, request: KnowledgeBaseUpdateRequest):
     """Update a knowledge base"""
     kb_store = get_kb_store()
     try:
@@ -462,15 +573,7 @@ async def update_admin_knowledge_base(kb_id: str, request: KnowledgeBaseUpdateRe
             collection=request.collection,
             embedding_model=request.embedding_model,
         )
-        return KnowledgeBaseResponse(
-            id=kb.id,
-            name=kb.name,
-            description=kb.description,
-            collection=kb.collection,
-            embedding_model=kb.embedding_model,
-            created_at=kb.created_at,
-            updated_at=kb.updated_at
-        )
+        return KnowledgeBaseResponse.model_validate(kb)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
     except ValueError as exc:
@@ -478,7 +581,7 @@ async def update_admin_knowledge_base(kb_id: str, request: KnowledgeBaseUpdateRe
 
 
 @app.delete("/v1/admin/knowledge-bases/{kb_id}", status_code=204)
-async def delete_admin_knowledge_base(kb_id: str):
+def delete_admin_knowledge_base(kb_id: str):
     """Delete a knowledge base"""
     kb_store = get_kb_store()
     try:
@@ -491,27 +594,29 @@ async def delete_admin_knowledge_base(kb_id: str):
 
 
 @app.get("/v1/rag/stats")
-async def rag_stats(kb_id: Optional[str] = None):
+def rag_stats(kb_id: Optional[str] = None):
     """Get RAG knowledge base statistics"""
     return get_kb_stats(kb_id)
 
 
 @app.get("/v1/rag/documents")
-async def rag_documents(kb_id: Optional[str] = None, limit: int = 50, offset: int = 0):
+def rag_documents(kb_id: Optional[str] = None, limit: int = 50, offset: int = 0):
     """List documents in the knowledge base"""
     return list_kb_documents(kb_id, limit, offset)
 
 
 @app.get("/v1/admin/models", response_model=List[CustomModelResponse])
-async def list_admin_models():
+def list_admin_models():
     """List the saved custom models"""
     store = get_config_store()
-    active_ids = store.active_model_ids
-    return [_build_model_response(m, active_ids) for m in store.list_models()]
+    active_ids = frozenset(store.active_model_ids)
+    return _json_list_response(
+        _MODEL_LIST_ADAPTER, [_build_model_response(m, active_ids) for m in store.list_models()]
+    )
 
 
 @app.post("/v1/admin/models", response_model=CustomModelResponse, status_code=201)
-async def create_admin_model(request: CustomModelCreateRequest):
+def create_admin_model(request: CustomModelCreateRequest):
     """Create a new custom model configuration"""
     store = get_config_store()
     try:
@@ -530,7 +635,7 @@ async def create_admin_model(request: CustomModelCreateRequest):
 
 
 @app.post("/v1/admin/models/{model_id}/activate", response_model=CustomModelResponse)
-async def activate_admin_model(model_id: str):
+def activate_admin_model(model_id: str):
     """Activate a saved custom model"""
     store = get_config_store()
     try:
@@ -542,7 +647,7 @@ async def activate_admin_model(model_id: str):
 
 
 @app.post("/v1/admin/models/{model_id}/deactivate", response_model=CustomModelResponse)
-async def deactivate_admin_model(model_id: str):
+def deactivate_admin_model(model_id: str):
     """Deactivate a saved custom model"""
     store = get_config_store()
     try:
@@ -556,17 +661,17 @@ async def deactivate_admin_model(model_id: str):
 
 
 @app.get("/v1/admin/models/{model_id}", response_model=CustomModelResponse)
-async def get_admin_model(model_id: str):
+def get_admin_model(model_id: str):
     """Get a single custom model by ID"""
     store = get_config_store()
     model = store.get_model(model_id)
     if not model:
         raise HTTPException(status_code=404, detail=f"Model '{model_id}' not found.")
-    return _build_model_response(model, store.active_model_ids)
+    return _json_model_response(_build_model_response(model, store.active_model_ids))
 
 
 @app.put("/v1/admin/models/{model_id}", response_model=CustomModelResponse)
-async def update_admin_model(model_id: str, request: CustomModelUpdateRequest):
+def update_admin_model(model_id: str, request: CustomModelUpdateRequest):
     """Update an existing custom model"""
     store = get_config_store()
     try:
@@ -588,7 +693,7 @@ async def update_admin_model(model_id: str, request: CustomModelUpdateRequest):
 
 
 @app.delete("/v1/admin/models/{model_id}", status_code=204)
-async def delete_admin_model(model_id: str):
+def delete_admin_model(model_id: str):
     """Delete a custom model by ID"""
     store = get_config_store()
     try:
@@ -603,19 +708,22 @@ async def delete_admin_model(model_id: str):
 # ========== VERSION MANAGEMENT ENDPOINTS ==========
 
 @app.get("/v1/admin/models/{model_id}/versions", response_model=List[VersionResponse])
-async def list_model_versions(model_id: str):
+def list_model_versions(model_id: str):
     """List all versions of a model"""
     store = get_config_store()
     try:
         versions = store.get_version_history(model_id)
         model = store.get_model(model_id)
-        return [_build_version_response(v, model.active_versions) for v in versions]
+        active_versions = frozenset(model.active_versions)
+        return _json_list_response(
+            _VERSION_LIST_ADAPTER, [_build_version_response(v, active_versions) for v in versions]
+        )
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
 
 @app.post("/v1/admin/models/{model_id}/versions", response_model=VersionResponse, status_code=201)
-async def create_model_version(model_id: str, request: CreateVersionRequest):
+def create_model_version(model_id: str, request: CreateVersionRequest):
     """Create a new version for a model"""
     store = get_config_store()
     try:
@@ -637,19 +745,19 @@ async def create_model_version(model_id: str, request: CreateVersionRequest):
 
 
 @app.get("/v1/admin/models/{model_id}/versions/{version}", response_model=VersionResponse)
-async def get_model_version(model_id: str, version: str):
+def get_model_version(model_id: str, version: str):
     """Get a specific version of a model"""
     store = get_config_store()
     try:
         version_config = store.get_version(model_id, version)
         model = store.get_model(model_id)
-        return _build_version_response(version_config, model.active_versions)
+        return _json_model_response(_build_version_response(version_config, model.active_versions))
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
 
 @app.post("/v1/admin/models/{model_id}/versions/{version}/activate", response_model=VersionResponse)
-async def activate_model_version(model_id: str, version: str):
+def activate_model_version(model_id: str, version: str):
     """Activate a specific version for client use"""
     store = get_config_store()
     try:
@@ -663,7 +771,7 @@ async def activate_model_version(model_id: str, version: str):
 
 
 @app.post("/v1/admin/models/{model_id}/versions/{version}/deactivate", response_model=VersionResponse)
-async def deactivate_model_version(model_id: str, version: str):
+def deactivate_model_version(model_id: str, version: str):
     """Deactivate a specific version (clients can't use it)"""
     store = get_config_store()
     try:
@@ -677,45 +785,26 @@ async def deactivate_model_version(model_id: str, version: str):
 
 
 @app.get("/v1/admin/tools", response_model=ToolListResponse)
-async def list_admin_tools():
+def list_admin_tools():
     """Return the tool names that can be assigned to custom models"""
     tool_store = get_tool_store()
     tools = tool_store.list_tools()
-    return ToolListResponse(tools=[t.name for t in tools if t.enabled])
+    return _json_model_response(ToolListResponse(tools=[t.name for t in tools if t.enabled]))
 
 
 @app.get("/v1/admin/tools/detailed", response_model=List[ToolResponse])
-async def list_admin_tools_detailed():
+def list_admin_tools_detailed():
     """Return detailed information about available tools"""
     tool_store = get_tool_store()
     tools = tool_store.list_tools()
-    return [
-        ToolResponse(
-            id=t.id,
-            name=t.name,
-            description=t.description,
-            category=t.category,
-            enabled=t.enabled,
-            is_builtin=t.is_builtin,
-            function_code=t.function_code,
-            parameters=[
-                ToolParameterResponse(
-                    name=p.name,
-                    type=p.type,
-                    description=p.description,
-                    required=p.required,
-                    default=p.default
-                ) for p in t.parameters
-            ],
-            created_at=t.created_at,
-            updated_at=t.updated_at
-        )
+    return _json_list_response(_TOOL_LIST_ADAPTER, [
+        ToolResponse.model_validate(t)
         for t in tools
-    ]
+    ])
 
 
 @app.post("/v1/admin/tools", response_model=ToolResponse, status_code=201)
-async def create_admin_tool(request: ToolCreateRequest):
+def create_admin_tool(request: ToolCreateRequest):
     """Create a new tool with optional Python function code"""
     tool_store = get_tool_store()
     try:
@@ -732,32 +821,13 @@ async def create_admin_tool(request: ToolCreateRequest):
             function_code=request.function_code,
             parameters=params,
         )
-        return ToolResponse(
-            id=tool.id,
-            name=tool.name,
-            description=tool.description,
-            category=tool.category,
-            enabled=tool.enabled,
-            is_builtin=tool.is_builtin,
-            function_code=tool.function_code,
-            parameters=[
-                ToolParameterResponse(
-                    name=p.name,
-                    type=p.type,
-                    description=p.description,
-                    required=p.required,
-                    default=p.default
-                ) for p in tool.parameters
-            ],
-            created_at=tool.created_at,
-            updated_at=tool.updated_at
-        )
+        return ToolResponse.model_validate(tool)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
 @app.get("/v1/admin/tools/{tool_id}", response_model=ToolResponse)
-async def get_admin_tool(tool_id: str):
+def get_admin_tool(tool_id: str):
     """Get a specific tool by ID"""
     tool_store = get_tool_store()
     tool = tool_store.get_tool(tool_id)
@@ -765,30 +835,11 @@ async def get_admin_tool(tool_id: str):
     if not tool:
         raise HTTPException(status_code=404, detail=f"Tool '{tool_id}' not found")
     
-    return ToolResponse(
-        id=tool.id,
-        name=tool.name,
-        description=tool.description,
-        category=tool.category,
-        enabled=tool.enabled,
-        is_builtin=tool.is_builtin,
-        function_code=tool.function_code,
-        parameters=[
-            ToolParameterResponse(
-                name=p.name,
-                type=p.type,
-                description=p.description,
-                required=p.required,
-                default=p.default
-            ) for p in tool.parameters
-        ],
-        created_at=tool.created_at,
-        updated_at=tool.updated_at
-    )
+    return _json_model_response(ToolResponse.model_validate(tool))
 
 
 @app.put("/v1/admin/tools/{tool_id}", response_model=ToolResponse)
-async def update_admin_tool(tool_id: str, request: ToolUpdateRequest):
+def update_admin_tool(tool_id: str, request: ToolUpdateRequest):
     """Update an existing tool"""
     tool_store = get_tool_store()
     try:
@@ -806,26 +857,7 @@ async def update_admin_tool(tool_id: str, request: ToolUpdateRequest):
             function_code=request.function_code,
             parameters=params,
         )
-        return ToolResponse(
-            id=tool.id,
-            name=tool.name,
-            description=tool.description,
-            category=tool.category,
-            enabled=tool.enabled,
-            is_builtin=tool.is_builtin,
-            function_code=tool.function_code,
-            parameters=[
-                ToolParameterResponse(
-                    name=p.name,
-                    type=p.type,
-                    description=p.description,
-                    required=p.required,
-                    default=p.default
-                ) for p in tool.parameters
-            ],
-            created_at=tool.created_at,
-            updated_at=tool.updated_at
-        )
+        return ToolResponse.model_validate(tool)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
     except ValueError as exc:
@@ -833,7 +865,7 @@ async def update_admin_tool(tool_id: str, request: ToolUpdateRequest):
 
 
 @app.delete("/v1/admin/tools/{tool_id}", status_code=204)
-async def delete_admin_tool(tool_id: str):
+def delete_admin_tool(tool_id: str):
     """Delete a tool by ID"""
     tool_store = get_tool_store()
     try:
@@ -855,7 +887,7 @@ async def test_admin_tool(tool_id: str, args: Dict[str, Any] = {}):
     """Test a tool by executing it with provided arguments"""
     tool_store = get_tool_store()
     try:
-        tool = tool_store.get_tool(tool_id)
+        tool = await asyncio.to_thread(tool_store.get_tool, tool_id)
         if not tool:
             raise HTTPException(status_code=404, detail=f"Tool '{tool_id}' not found")
         
@@ -866,7 +898,7 @@ async def test_admin_tool(tool_id: str, args: Dict[str, Any] = {}):
                 result = datetime.now().isoformat()
             elif tool.name == "search_knowledge_base":
                 query = args.get("query", "test")
-                docs = retrieve_relevant_context(query, k=3)
+                docs = await aretrieve_relevant_context(query, k=3)
                 result = [{"content": doc.page_content, "source": doc.metadata.get("source", "unknown")} for doc in docs]
             else:
                 result = f"Built-in tool '{tool.name}' executed successfully"
@@ -878,10 +910,13 @@ async def test_admin_tool(tool_id: str, args: Dict[str, Any] = {}):
             # Execute the custom tool code
             local_vars = {}
             try:
-                exec(tool.function_code, {"__builtins__": __builtins__, "requests": requests}, local_vars)
+                # Tool code may block (e.g. requests calls), so run it in the threadpool
+                await asyncio.to_thread(
+                    exec, tool.function_code, {"__builtins__": __builtins__, "requests": requests}, local_vars
+                )
                 if "main" not in local_vars:
                     raise HTTPException(status_code=400, detail="Tool code must define a 'main' function")
-                result = local_vars["main"](**args)
+                result = await asyncio.to_thread(local_vars["main"], **args)
             except Exception as e:
                 raise HTTPException(status_code=400, detail=f"Tool execution error: {str(e)}")
         
@@ -900,16 +935,19 @@ async def test_admin_tool(tool_id: str, args: Dict[str, Any] = {}):
 
 
 @app.post("/v1/rag/reload")
-async def rag_reload(kb_id: Optional[str] = None):
+def rag_reload(kb_id: Optional[str] = None):
     """Reload the RAG knowledge base"""
     try:
         reload_knowledge_base(kb_id)
-        return {"status": "success", "message": "Knowledge base reloaded", "stats": get_kb_stats(kb_id)}
+        stats = get_kb_stats(kb_id)
+        return {"status": "success", "message": "Knowledge base reloaded", "stats": stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 class SearchRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+    
     query: str
     top_k: Optional[int] = 3
 
@@ -925,15 +963,27 @@ class SearchResponse(BaseModel):
     query: str
 
 
+class BatchSearchRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+    
+    queries: List[str]
+    top_k: Optional[int] = 3
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]
+
+
 @app.post("/v1/rag/search")
 async def rag_search(request: SearchRequest, kb_id: Optional[str] = None):
     """Search the knowledge base directly"""
     try:
-        docs = retrieve_relevant_context(request.query, k=request.top_k, kb_id=kb_id)
+        docs = await aretrieve_relevant_context(request.query, k=request.top_k, kb_id=kb_id)
         results = [
             SearchResult(
                 content=doc.page_content,
                 source=doc.metadata.get("source", "unknown"),
+                score=doc.metadata.get("score"),
             )
             for doc in docs
         ]
@@ -942,18 +992,102 @@ async def rag_search(request: SearchRequest, kb_id: Optional[str] = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/v1/rag/search/batch")
+async def rag_search_batch(request: BatchSearchRequest, kb_id: Optional[str] = None):
+    """Search the knowledge base for several queries at once"""
+    try:
+        docs_per_query = await aretrieve_relevant_contexts(request.queries, k=request.top_k, kb_id=kb_id)
+        return BatchSearchResponse(results=[
+            SearchResponse(
+                results=[
+                    SearchResult(
+                        content=doc.page_content,
+                        source=doc.metadata.get("source", "unknown"),
+                        score=doc.metadata.get("score"),
+                    )
+                    for doc in docs
+                ],
+                query=query,
+            )
+            for query, docs in zip(request.queries, docs_per_query)
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 class ImportTextRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+    
     texts: List[str]
     sources: Optional[List[str]] = None
 
 
 class ImportDocumentRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+    
     content: str
     source: str
 
 
 class ImportBatchRequest(BaseModel):
+    """Body of /v1/rag/import/documents; valid bodies are decoded with orjson, invalid ones through this model."""
+    model_config = _REQUEST_MODEL_CONFIG
+    
     documents: List[ImportDocumentRequest]
+    batch_size: Optional[int] = Field(
+        default=None, gt=0, description="Chunks per embedding call (defaults to RAG_EMBED_BATCH_SIZE)"
+    )
+
+
+def _parse_import_documents(body: bytes) -> Tuple[List[Document], Optional[int]]:
+    """Decode an ImportBatchRequest body straight into documents without building Pydantic models.
+    
+    Bodies the fast path does not accept are handed to ImportBatchRequest, so they are
+    accepted or rejected exactly as a model-typed endpoint would, with the same 422 errors.
+    """
+    try:
+        payload = orjson.loads(body)
+        items = payload["documents"]
+        batch_size = payload.get("batch_size")
+        if batch_size is not None and (type(batch_size) is not int or batch_size <= 0):
+            raise TypeError("batch_size must be a positive integer")
+        documents = []
+        for item in items:
+            content, source = item["content"], item["source"]
+            if not isinstance(content, str) or not isinstance(source, str):
+                raise TypeError("document content and source must be strings")
+            documents.append(Document(page_content=content, metadata={"source": source}))
+        return documents, batch_size
+    except (ValueError, KeyError, TypeError, AttributeError):
+        pass
+    
+    try:
+        request = ImportBatchRequest.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)],
+            body=body,
+        )
+    documents = [Document(page_content=d.content, metadata={"source": d.source}) for d in request.documents]
+    return documents, request.batch_size
+
+
+def _request_body_schema(model: type) -> Dict[str, Any]:
+    """JSON schema of a request model with its $defs inlined, for use in openapi_extra."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    
+    def inline(node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return inline(defs[ref[len("#/$defs/"):]])
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(item) for item in node]
+        return node
+    
+    return inline(schema)
 
 
 class ImportResponse(BaseModel):
@@ -969,7 +1103,7 @@ async def rag_import_texts(request: ImportTextRequest, kb_id: Optional[str] = No
         metadatas = None
         if request.sources:
             metadatas = [{"source": s} for s in request.sources]
-        result = import_texts(request.texts, metadatas, kb_id)
+        result = await aimport_texts(request.texts, metadatas, kb_id)
         return ImportResponse(
             status="success",
             original_count=result["original_texts"],
@@ -979,15 +1113,25 @@ async def rag_import_texts(request: ImportTextRequest, kb_id: Optional[str] = No
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/v1/rag/import/documents")
-async def rag_import_documents(request: ImportBatchRequest, kb_id: Optional[str] = None):
-    """Import documents into the knowledge base"""
+@app.post(
+    "/v1/rag/import/documents",
+    response_model=ImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _request_body_schema(ImportBatchRequest)}},
+        },
+    },
+)
+async def rag_import_documents(request: Request, kb_id: Optional[str] = None):
+    """Import documents into the knowledge base
+    
+    The body (see ImportBatchRequest) can carry large batches, so it is decoded
+    with orjson directly instead of through Pydantic models.
+    """
+    docs, batch_size = _parse_import_documents(await request.body())
     try:
-        docs = [
-            Document(page_content=d.content, metadata={"source": d.source})
-            for d in request.documents
-        ]
-        result = import_documents(docs, kb_id)
+        result = await aimport_documents(docs, kb_id, batch_size)
         return ImportResponse(
             status="success",
             original_count=result["original_documents"],
@@ -998,11 +1142,10 @@ async def rag_import_documents(request: ImportBatchRequest, kb_id: Optional[str]
 
 
 @app.delete("/v1/rag/clear")
-async def rag_clear(kb_id: Optional[str] = None):
+def rag_clear(kb_id: Optional[str] = None):
     """Clear all documents from the knowledge base"""
     try:
-        result = clear_knowledge_base(kb_id)
-        return result
+        return clear_knowledge_base(kb_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1032,7 +1175,7 @@ class ChatLogStats(BaseModel):
 
 
 @app.get("/v1/admin/logs")
-async def list_chat_logs(
+def list_chat_logs(
     model: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 50,
@@ -1073,7 +1216,7 @@ async def list_chat_logs(
 
 
 @app.get("/v1/admin/logs/stats")
-async def get_chat_log_stats():
+def get_chat_log_stats():
     """Get statistics about chat logs"""
     try:
         all_logs = ChatLogService.list_logs(limit=10000, offset=0)
@@ -1122,7 +1265,7 @@ async def get_chat_log_stats():
 
 
 @app.get("/v1/admin/logs/{log_id}")
-async def get_chat_log(log_id: str, include_tool_logs: bool = False):
+def get_chat_log(log_id: str, include_tool_logs: bool = False):
     """Get a specific chat log by ID
     
     Query parameters:
@@ -1149,7 +1292,7 @@ async def get_chat_log(log_id: str, include_tool_logs: bool = False):
 
 
 @app.get("/v1/admin/logs/chat/{chat_id}")
-async def get_chat_log_by_chat_id(chat_id: str, include_tool_logs: bool = False):
+def get_chat_log_by_chat_id(chat_id: str, include_tool_logs: bool = False):
     """Get a chat log by chat completion ID (chatcmpl-xxx)
     
     Query parameters:
@@ -1176,7 +1319,7 @@ async def get_chat_log_by_chat_id(chat_id: str, include_tool_logs: bool = False)
 
 
 @app.delete("/v1/admin/logs/{log_id}")
-async def delete_chat_log(log_id: str):
+def delete_chat_log(log_id: str):
     """Delete a specific chat log"""
     try:
         success = ChatLogService.delete_log(log_id)
@@ -1190,7 +1333,7 @@ async def delete_chat_log(log_id: str):
 
 
 @app.delete("/v1/admin/logs")
-async def clear_chat_logs(before_days: Optional[int] = None):
+def clear_chat_logs(before_days: Optional[int] = None):
     """Clear chat logs, optionally only before a certain number of days ago
     
     Query parameters:
@@ -1211,7 +1354,7 @@ async def clear_chat_logs(before_days: Optional[int] = None):
 # ============ Tool Execution Logs API ============
 
 @app.get("/v1/admin/tool-logs")
-async def list_tool_execution_logs(
+def list_tool_execution_logs(
     limit: int = 50,
     offset: int = 0,
     tool_name: Optional[str] = None,
@@ -1246,7 +1389,7 @@ async def list_tool_execution_logs(
 
 
 @app.get("/v1/admin/tool-logs/stats")
-async def get_tool_execution_stats():
+def get_tool_execution_stats():
     """Get statistics about tool executions"""
     from server.server.database import ToolExecutionLogService
     
@@ -1267,7 +1410,7 @@ async def get_tool_execution_stats():
 
 
 @app.get("/v1/admin/tool-logs/{log_id}")
-async def get_tool_execution_log(log_id: str):
+def get_tool_execution_log(log_id: str):
     """Get a specific tool execution log by ID"""
     from server.server.database import ToolExecutionLogService
     
@@ -1279,7 +1422,7 @@ async def get_tool_execution_log(log_id: str):
 
 
 @app.get("/v1/admin/tool-logs/chat/{chat_log_id}")
-async def get_tool_executions_for_chat(chat_log_id: str):
+def get_tool_executions_for_chat(chat_log_id: str):
     """Get all tool execution logs for a specific chat"""
     from server.server.database import ToolExecutionLogService
     
@@ -1295,7 +1438,7 @@ async def get_tool_executions_for_chat(chat_log_id: str):
 # ============ Agent Event Logs API ============
 
 @app.get("/v1/admin/agent-events/{chat_log_id}")
-async def get_agent_events_for_chat(chat_log_id: str):
+def get_agent_events_for_chat(chat_log_id: str):
     """Get all agent events for a specific chat in sequential order - shows the LangGraph execution flow"""
     from server.server.database import AgentEventLogService
     
@@ -1309,7 +1452,7 @@ async def get_agent_events_for_chat(chat_log_id: str):
 
 
 @app.delete("/v1/admin/tool-logs/{log_id}")
-async def delete_tool_execution_log(log_id: str):
+def delete_tool_execution_log(log_id: str):
     """Delete a specific tool execution log"""
     from server.server.database import ToolExecutionLogService
     
@@ -1321,7 +1464,7 @@ async def delete_tool_execution_log(log_id: str):
 
 
 @app.delete("/v1/admin/tool-logs")
-async def clear_tool_execution_logs(before_days: Optional[int] = None):
+def clear_tool_execution_logs(before_days: Optional[int] = None):
     """Clear tool execution logs, optionally only before a certain number of days ago"""
     from server.server.database import ToolExecutionLogService
     
@@ -1334,11 +1477,12 @@ async def clear_tool_execution_logs(before_days: Optional[int] = None):
     return {"status": "cleared", "deleted_count": count}
 
 
-@app.get("/v1/models")
-async def list_models():
+@app.get("/v1/models", response_model=ModelListResponse)
+def list_models():
     """List available models - OpenAI compatible"""
     store = get_config_store()
-    active_models = [store.get_model(mid) for mid in store.active_model_ids if store.get_model(mid)]
+    active_models = [model for model in map(store.get_model, store.active_model_ids) if model]
+    created = _NOW[0]
     
     model_infos = []
     for model in active_models:
@@ -1347,23 +1491,23 @@ async def list_models():
             for version in model.active_versions:
                 model_infos.append(ModelInfo(
                     id=f"{model.name}@{version}",
-                    created=int(time.time()),
+                    created=created,
                 ))
         else:
             # If no active versions specified, just use the model name
             model_infos.append(ModelInfo(
                 id=model.name,
-                created=int(time.time()),
+                created=created,
             ))
     
     # If no active custom models, fall back to default
     if not model_infos:
         model_infos = [ModelInfo(
             id=DEFAULT_MODEL,
-            created=int(time.time()),
+            created=created,
         )]
     
-    return ModelListResponse(data=model_infos)
+    return _json_model_response(ModelListResponse(data=model_infos))
 
 
 @app.get("/v1/base-models")
@@ -1377,35 +1521,35 @@ async def list_base_models():
         # Ensure base_url ends with /v1 for OpenAI compatibility, but we need the base for Ollama API
         ollama_base = base_url.rstrip("/v1").rstrip("/")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{ollama_base}/api/tags",
-                headers={"Authorization": f"Bearer {api_key}"} if api_key else {}
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            models = data.get("models", [])
-            
-            # Convert to OpenAI-compatible format
-            model_infos = []
-            for model in models:
-                model_infos.append(ModelInfo(
-                    id=model.get("name", ""),
-                    created=int(time.time()),
-                    owned_by="ollama"
-                ))
-            
-            return ModelListResponse(data=model_infos)
+        response = await get_llm_async_http_client().get(
+            f"{ollama_base}/api/tags",
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            timeout=10.0,
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        models = data.get("models", [])
+        
+        # Convert to OpenAI-compatible format
+        model_infos = []
+        for model in models:
+            model_infos.append(ModelInfo(
+                id=model.get("name", ""),
+                created=_NOW[0],
+                owned_by="ollama"
+            ))
+        
+        return ModelListResponse(data=model_infos)
             
     except httpx.RequestError as e:
-        logger.error(f"Failed to connect to Ollama API: {e}")
+        logger.error("Failed to connect to Ollama API: %s", e)
         raise HTTPException(status_code=503, detail=f"Unable to connect to Ollama API: {str(e)}")
     except httpx.HTTPStatusError as e:
-        logger.error(f"Ollama API returned error: {e.response.status_code} - {e.response.text}")
+        logger.error("Ollama API returned error: %s - %s", e.response.status_code, e.response.text)
         raise HTTPException(status_code=503, detail=f"Ollama API error: {e.response.status_code}")
     except Exception as e:
-        logger.error(f"Unexpected error fetching base models: {e}")
+        logger.error("Unexpected error fetching base models: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch base models: {str(e)}")
 
 
@@ -1423,6 +1567,19 @@ def _resolve_model_config(request_model: str) -> Optional[str]:
     Returns the model config ID if found, None otherwise.
     Raises HTTPException if model is disabled or version is not active.
     """
+    model_id, error = _resolve_model_config_cached(request_model, get_config_store().epoch)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    return model_id
+
+
+@lru_cache(maxsize=1024)
+def _resolve_model_config_cached(request_model: str, epoch: int) -> Tuple[Optional[str], Optional[str]]:
+    """Resolve a model identifier for one store epoch, returning (model config ID, error detail).
+    
+    The epoch is a generation counter committed with every model write. This worker
+    sees its own writes immediately and other workers' within MODEL_EPOCH_TTL seconds.
+    """
     store = get_config_store()
     
     # Parse model identifier (may include version)
@@ -1436,41 +1593,198 @@ def _resolve_model_config(request_model: str) -> Optional[str]:
         
         # Check if model is enabled
         if not model.enabled:
-            raise HTTPException(status_code=400, detail=f"Model '{model_name}' is disabled.")
+            return (None, f"Model '{model_name}' is disabled.")
         
         # If a specific version was requested, verify it's active
         if requested_version and version_config:
             if requested_version not in model.active_versions:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Version '{requested_version}' of model '{model_name}' is not active. "
-                           f"Active versions: {', '.join(model.active_versions)}"
+                return (
+                    None,
+                    f"Version '{requested_version}' of model '{model_name}' is not active. "
+                    f"Active versions: {', '.join(model.active_versions)}",
                 )
         
-        return model.id
+        return (model.id, None)
     else:
         # Check if it's a direct model ID (without version)
         direct_model = store.get_model(model_name)
         if direct_model:
             if not direct_model.enabled:
-                raise HTTPException(status_code=400, detail=f"Model '{model_name}' is disabled.")
-            return direct_model.id
+                return (None, f"Model '{model_name}' is disabled.")
+            return (direct_model.id, None)
     
     # Otherwise, use default LLM (no custom model config)
-    return None
+    return (None, None)
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Load the cl100k_base BPE once; None if tiktoken or its data files are unavailable."""
+    try:
+        import tiktoken
+        
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable, token counts fall back to word counts: %s", e)
+        return None
+
+
+def _estimate_tokens(texts: Iterable[str]) -> int:
+    """Count tokens with the cl100k_base BPE, or approximate them as words without tiktoken."""
+    texts = list(texts)
+    encoding = _get_token_encoding()
+    if encoding is None:
+        # Words ~ spaces + 1; str.count runs in C without allocating a list of words
+        return sum(text.count(" ") + 1 for text in texts if text)
+    # Message text may legitimately contain special-token strings such as <|endoftext|>
+    return sum(len(tokens) for tokens in encoding.encode_batch(texts, disallowed_special=()))
+
+
+_ROLE_TO_MESSAGE = {
+    "system": SystemMessage,
+    "user": HumanMessage,
+    "assistant": AIMessage,
+}
 
 
 def _convert_messages_to_langchain(messages: List[ChatMessage]) -> list:
-    """Convert OpenAI-format messages to LangChain messages."""
-    langchain_messages = []
-    for msg in messages:
-        if msg.role == "system":
-            langchain_messages.append(SystemMessage(content=msg.content))
-        elif msg.role == "user":
-            langchain_messages.append(HumanMessage(content=msg.content))
-        elif msg.role == "assistant":
-            langchain_messages.append(AIMessage(content=msg.content))
-    return langchain_messages
+    """Convert OpenAI-format messages to LangChain messages, skipping unsupported roles."""
+    return [
+        message_cls(content=msg.content)
+        for msg in messages
+        if (message_cls := _ROLE_TO_MESSAGE.get(msg.role)) is not None
+    ]
+
+
+# Admission control for graph runs: at most MAX_CONCURRENT_LLM run at once and at most
+# MAX_QUEUED_LLM wait for a slot; further chat requests are rejected with 429.
+# The slots are app.state.llm_semaphore, created in lifespan.
+MAX_CONCURRENT_LLM = int(os.getenv("MAX_CONCURRENT_LLM", "8"))
+MAX_QUEUED_LLM = int(os.getenv("MAX_QUEUED_LLM", "32"))
+# Seconds a queued request waits for a slot before giving up with 503 (0 waits indefinitely)
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+# Chat requests admitted by the handler that are running or waiting for a slot
+_llm_admitted = 0
+
+
+class _LLMAdmission:
+    """An admitted chat request, counted against the slot and queue limits until released."""
+
+    def __init__(self) -> None:
+        global _llm_admitted
+        _llm_admitted += 1
+        self._released = False
+
+    def release(self) -> None:
+        global _llm_admitted
+        if not self._released:
+            self._released = True
+            _llm_admitted -= 1
+
+
+def _admit_llm_request() -> _LLMAdmission:
+    """Admit a chat request, or reject it with 429 when every slot and queue position is taken.
+    
+    Admission happens in the handler, before a streaming body starts, so bursts
+    of streaming requests are counted as soon as they arrive.
+    """
+    if _llm_admitted >= MAX_CONCURRENT_LLM + MAX_QUEUED_LLM:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent chat requests, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+    return _LLMAdmission()
+
+
+def _release_if_acquired(semaphore: asyncio.Semaphore, acquire: "asyncio.Future[bool]") -> None:
+    """Return the permit of an abandoned acquire that completed anyway."""
+    if not acquire.cancelled() and acquire.exception() is None:
+        semaphore.release()
+
+
+async def _acquire_llm_semaphore(semaphore: asyncio.Semaphore) -> None:
+    """Wait up to LLM_QUEUE_TIMEOUT for a graph slot, raising 503 on timeout.
+    
+    Before Python 3.12, asyncio.wait_for can report a timeout for an acquire that
+    already succeeded and leak the permit; here an abandoned acquire always hands
+    its permit back.
+    """
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    try:
+        done, _ = await asyncio.wait((acquire,), timeout=LLM_QUEUE_TIMEOUT or None)
+    except BaseException:
+        acquire.cancel()
+        acquire.add_done_callback(partial(_release_if_acquired, semaphore))
+        raise
+    if not done:
+        acquire.cancel()
+        acquire.add_done_callback(partial(_release_if_acquired, semaphore))
+        raise HTTPException(
+            status_code=503,
+            detail="Timed out waiting for a free model slot, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+
+@asynccontextmanager
+async def _llm_slot(admission: _LLMAdmission):
+    """Hold one of the MAX_CONCURRENT_LLM graph slots, then release the admission."""
+    semaphore = app.state.llm_semaphore
+    try:
+        await _acquire_llm_semaphore(semaphore)
+        try:
+            yield
+        finally:
+            semaphore.release()
+    finally:
+        admission.release()
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """StreamingResponse that releases its admission even if the body is never iterated."""
+
+    def __init__(self, content: AsyncGenerator[bytes, None], admission: _LLMAdmission, **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self.admission = admission
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admission.release()
+
+
+async def _stream_with_llm_slot(
+    stream: AsyncGenerator[bytes, None], admission: _LLMAdmission
+) -> AsyncGenerator[bytes, None]:
+    """Run a response stream while holding a graph slot.
+    
+    The response has already started when the slot is requested, so a queue
+    timeout is reported as an SSE error frame instead of a 503.
+    """
+    try:
+        async with _llm_slot(admission):
+            async for chunk in stream:
+                yield chunk
+    except HTTPException as e:
+        yield b"data: " + orjson.dumps({"error": {"message": e.detail, "type": "server_error"}}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+
+def _content_frame_parts(chat_id: str, created: int, model: str) -> Tuple[bytes, bytes]:
+    """Return the bytes around the content value of a ChatCompletionChunk SSE frame.
+    
+    Only the token text differs between content frames of one stream, so each
+    frame is this prefix, the JSON-encoded text and this suffix.
+    """
+    prefix = (
+        b'data: {"id":' + orjson.dumps(chat_id)
+        + b',"object":"chat.completion.chunk","created":' + orjson.dumps(created)
+        + b',"model":' + orjson.dumps(model)
+        + b',"choices":[{"index":0,"delta":{"role":null,"content":'
+    )
+    return prefix, b'},"finish_reason":null}]}\n\n'
 
 
 async def _stream_chat_response(
@@ -1479,11 +1793,11 @@ async def _stream_chat_response(
     langchain_messages: list,
     kb_id: Optional[str] = None,
     request_headers: Optional[Dict[str, str]] = None,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """Generate SSE stream for chat completions using LangGraph streaming."""
-    chat_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-    created = int(time.time())
-    start_time = time.time()
+    chat_id = f"chatcmpl-{os.urandom(4).hex()}"
+    created = _NOW[0]
+    start_time = time.monotonic()
     
     # Extract messages for logging
     request_messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
@@ -1493,7 +1807,9 @@ async def _stream_chat_response(
     # Create chat log entry
     chat_log = None
     try:
-        chat_log = ChatLogService.create_log(
+        # Chat log writes use the sync DB session; keep them off the event loop
+        chat_log = await asyncio.to_thread(
+            ChatLogService.create_log,
             chat_id=chat_id,
             model_name=request.model,
             request_messages=request_messages,
@@ -1503,24 +1819,25 @@ async def _stream_chat_response(
             system_message=system_message,
             user_message=user_message,
         )
-        logger.info(f"Chat log created: {chat_log.id} for chat_id: {chat_id}")
+        logger.info("Chat log created: %s for chat_id: %s", chat_log.id, chat_id)
     except Exception as e:
-        logger.error(f"Failed to create chat log: {e}")
+        logger.error("Failed to create chat log: %s", e)
     
     # Send initial chunk with role
-    initial_chunk = ChatCompletionChunk(
+    initial_chunk = ChatCompletionChunk.model_construct(
         id=chat_id,
         created=created,
         model=request.model,
         choices=[
-            ChatCompletionChunkChoice(
+            ChatCompletionChunkChoice.model_construct(
                 index=0,
-                delta=ChatCompletionChunkDelta(role="assistant"),
+                delta=ChatCompletionChunkDelta.model_construct(role="assistant"),
                 finish_reason=None,
             )
         ],
     )
-    yield f"data: {initial_chunk.model_dump_json()}\n\n"
+    yield b"data: " + initial_chunk.model_dump_json().encode() + b"\n\n"
+    frame_prefix, frame_suffix = _content_frame_parts(chat_id, created, request.model)
     
     # Track response content and tool calls
     full_response = []
@@ -1575,14 +1892,14 @@ async def _stream_chat_response(
                     "input": tool_input,
                     "start_time": time.time(),
                 })
-                logger.info(f"Tool call started: {tool_name} with input: {tool_input}")
+                logger.info("Tool call started: %s with input: %s", tool_name, tool_input)
             
             elif kind == "on_tool_end":
                 tool_output = event.get("data", {}).get("output", "")
                 if tool_calls_log:
                     tool_calls_log[-1]["output"] = str(tool_output)[:1000]  # Limit output size
                     tool_calls_log[-1]["end_time"] = time.time()
-                logger.info(f"Tool call ended with output: {str(tool_output)[:200]}")
+                logger.info("Tool call ended with output: %.200s", tool_output)
             
             # Handle streaming tokens from the LLM
             elif kind == "on_chat_model_stream":
@@ -1604,40 +1921,28 @@ async def _stream_chat_response(
                     
                     if content:
                         full_response.append(content)
-                        stream_chunk = ChatCompletionChunk(
-                            id=chat_id,
-                            created=created,
-                            model=request.model,
-                            choices=[
-                                ChatCompletionChunkChoice(
-                                    index=0,
-                                    delta=ChatCompletionChunkDelta(content=content),
-                                    finish_reason=None,
-                                )
-                            ],
-                        )
-                        yield f"data: {stream_chunk.model_dump_json()}\n\n"
+                        yield frame_prefix + orjson.dumps(content) + frame_suffix
         
         # Send final chunk with finish_reason
-        final_chunk = ChatCompletionChunk(
+        final_chunk = ChatCompletionChunk.model_construct(
             id=chat_id,
             created=created,
             model=request.model,
             choices=[
-                ChatCompletionChunkChoice(
+                ChatCompletionChunkChoice.model_construct(
                     index=0,
-                    delta=ChatCompletionChunkDelta(),
+                    delta=ChatCompletionChunkDelta.model_construct(),
                     finish_reason="stop",
                 )
             ],
         )
-        yield f"data: {final_chunk.model_dump_json()}\n\n"
-        yield "data: [DONE]\n\n"
+        yield b"data: " + final_chunk.model_dump_json().encode() + b"\n\n"
+        yield b"data: [DONE]\n\n"
         
         # Update chat log with success
         if chat_log:
             response_content = "".join(full_response)
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.monotonic() - start_time) * 1000)
             
             # Use accumulated tokens from LLM events, fallback to word-based estimate
             prompt_tokens = accumulated_prompt_tokens
@@ -1645,13 +1950,14 @@ async def _stream_chat_response(
             total_tokens = accumulated_total_tokens
             
             if total_tokens == 0:
-                # Fallback to word-based estimate
-                prompt_tokens = sum(len(msg["content"].split()) for msg in request_messages if msg.get("content"))
-                completion_tokens = len(response_content.split()) if response_content else 0
+                # Fallback to a local token estimate
+                prompt_tokens = _estimate_tokens(msg["content"] for msg in request_messages if msg.get("content"))
+                completion_tokens = _estimate_tokens((response_content,)) if response_content else 0
                 total_tokens = prompt_tokens + completion_tokens
             
             try:
-                ChatLogService.update_log(
+                await asyncio.to_thread(
+                    ChatLogService.update_log,
                     log_id=chat_log.id,
                     response_content=response_content,
                     tools_used=tools_used if tools_used else None,
@@ -1662,25 +1968,29 @@ async def _stream_chat_response(
                     latency_ms=latency_ms,
                     status="success",
                 )
-                logger.info(f"Chat log updated: {chat_log.id}, latency: {latency_ms}ms, tools: {tools_used}, tokens: {total_tokens}")
+                logger.info(
+                    "Chat log updated: %s, latency: %sms, tools: %s, tokens: %s",
+                    chat_log.id, latency_ms, tools_used, total_tokens,
+                )
             except Exception as e:
-                logger.error(f"Failed to update chat log: {e}")
+                logger.error("Failed to update chat log: %s", e)
         
     except Exception as e:
         # Update chat log with error
         if chat_log:
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = int((time.monotonic() - start_time) * 1000)
             try:
-                ChatLogService.update_log(
+                await asyncio.to_thread(
+                    ChatLogService.update_log,
                     log_id=chat_log.id,
                     status="error",
                     error_message=str(e),
                     error_type=type(e).__name__,
                     latency_ms=latency_ms,
                 )
-                logger.error(f"Chat log error recorded: {chat_log.id}, error: {e}")
+                logger.error("Chat log error recorded: %s, error: %s", chat_log.id, e)
             except Exception as log_error:
-                logger.error(f"Failed to update chat log with error: {log_error}")
+                logger.error("Failed to update chat log with error: %s", log_error)
         
         # Send error in stream format
         error_chunk = {
@@ -1689,8 +1999,8 @@ async def _stream_chat_response(
                 "type": "server_error",
             }
         }
-        yield f"data: {json.dumps(error_chunk)}\n\n"
-        yield "data: [DONE]\n\n"
+        yield b"data: " + orjson.dumps(error_chunk) + b"\n\n"
+        yield b"data: [DONE]\n\n"
 
 
 @app.post("/v1/chat/completions")
@@ -1729,16 +2039,22 @@ async def chat_completions(
             request_headers[header_name_lower] = header_value
         
     try:
-        # Resolve model configuration
-        model_config_id = _resolve_model_config(request.model)
+        # Resolve model configuration; a cache miss or epoch refresh queries the database
+        model_config_id = await asyncio.to_thread(_resolve_model_config, request.model)
         
         # Convert messages to LangChain format
         langchain_messages = _convert_messages_to_langchain(request.messages)
         
+        admission = _admit_llm_request()
+        
         # Handle streaming request
         if request.stream:
-            return StreamingResponse(
-                _stream_chat_response(request, model_config_id, langchain_messages, kb_id, request_headers),
+            return _AdmittedStreamingResponse(
+                _stream_with_llm_slot(
+                    _stream_chat_response(request, model_config_id, langchain_messages, kb_id, request_headers),
+                    admission,
+                ),
+                admission,
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
@@ -1748,41 +2064,48 @@ async def chat_completions(
             )
         
         # Non-streaming request - use regular invoke
-        chat_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-        start_time = time.time()
+        chat_id = f"chatcmpl-{os.urandom(4).hex()}"
+        start_time = time.monotonic()
         
         # Extract messages for logging
         request_messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
         user_message = next((msg.content for msg in reversed(request.messages) if msg.role == "user"), None)
         system_message = next((msg.content for msg in request.messages if msg.role == "system"), None)
         
-        # Create chat log entry
+        # The slot is taken before the chat log is created, so a queue timeout (503)
+        # cannot leave a log row behind in "pending"
         chat_log = None
-        try:
-            chat_log = ChatLogService.create_log(
-                chat_id=chat_id,
-                model_name=request.model,
-                request_messages=request_messages,
-                is_stream=False,
-                model_config_id=model_config_id,
-                kb_id=kb_id,
-                system_message=system_message,
-                user_message=user_message,
-            )
-            logger.info(f"Chat log created: {chat_log.id} for chat_id: {chat_id}")
-        except Exception as e:
-            logger.error(f"Failed to create chat log: {e}")
-        
-        # Get chat_log_id for linking tool executions
-        chat_log_id = chat_log.id if chat_log else None
-        
-        result = graph.invoke({
-            "messages": langchain_messages,
-            "model_config_id": model_config_id,
-            "kb_id": kb_id,
-            "request_headers": request_headers,
-            "chat_log_id": chat_log_id
-        })
+        async with _llm_slot(admission):
+            # Create chat log entry; chat log writes use the sync DB session, so keep
+            # them off the event loop
+            try:
+                chat_log = await asyncio.to_thread(
+                    ChatLogService.create_log,
+                    chat_id=chat_id,
+                    model_name=request.model,
+                    request_messages=request_messages,
+                    is_stream=False,
+                    model_config_id=model_config_id,
+                    kb_id=kb_id,
+                    system_message=system_message,
+                    user_message=user_message,
+                )
+                logger.info("Chat log created: %s for chat_id: %s", chat_log.id, chat_id)
+            except Exception as e:
+                logger.error("Failed to create chat log: %s", e)
+            
+            # Get chat_log_id for linking tool executions
+            chat_log_id = chat_log.id if chat_log else None
+            
+            # The graph's nodes are synchronous; run it in a worker thread so other
+            # requests keep being served while the LLM responds
+            result = await asyncio.to_thread(graph.invoke, {
+                "messages": langchain_messages,
+                "model_config_id": model_config_id,
+                "kb_id": kb_id,
+                "request_headers": request_headers,
+                "chat_log_id": chat_log_id
+            })
         
         # Get the last AI message
         response_message = result["messages"][-1]
@@ -1811,18 +2134,19 @@ async def chat_completions(
         completion_tokens = result.get("completion_tokens") or 0
         total_tokens = result.get("total_tokens") or 0
         
-        # Fallback to word-based estimate if no token data
+        # Fallback to a local token estimate if no token data
         if total_tokens == 0:
-            prompt_tokens = sum(len(msg.content.split()) for msg in request.messages if msg.content)
-            completion_tokens = len(response_content.split()) if response_content else 0
+            prompt_tokens = _estimate_tokens(msg.content for msg in request.messages if msg.content)
+            completion_tokens = _estimate_tokens((response_content,)) if response_content else 0
             total_tokens = prompt_tokens + completion_tokens
         
-        latency_ms = int((time.time() - start_time) * 1000)
+        latency_ms = int((time.monotonic() - start_time) * 1000)
         
         # Update chat log with success
         if chat_log:
             try:
-                ChatLogService.update_log(
+                await asyncio.to_thread(
+                    ChatLogService.update_log,
                     log_id=chat_log.id,
                     response_content=response_content,
                     tools_used=tools_used if tools_used else None,
@@ -1833,22 +2157,26 @@ async def chat_completions(
                     latency_ms=latency_ms,
                     status="success",
                 )
-                logger.info(f"Chat log updated: {chat_log.id}, latency: {latency_ms}ms, tools: {tools_used}, tokens: {total_tokens}")
+                logger.info(
+                    "Chat log updated: %s, latency: %sms, tools: %s, tokens: %s",
+                    chat_log.id, latency_ms, tools_used, total_tokens,
+                )
             except Exception as e:
-                logger.error(f"Failed to update chat log: {e}")
+                logger.error("Failed to update chat log: %s", e)
         
-        return ChatCompletionResponse(
+        # Every field is produced by the server, so skip re-validating the response tree
+        return ChatCompletionResponse.model_construct(
             id=chat_id,
-            created=int(time.time()),
+            created=_NOW[0],
             model=request.model,
             choices=[
-                ChatCompletionChoice(
+                ChatCompletionChoice.model_construct(
                     index=0,
-                    message=ChatMessage(role="assistant", content=response_content),
+                    message=ChatMessage.model_construct(role="assistant", content=response_content),
                     finish_reason="stop",
                 )
             ],
-            usage=Usage(
+            usage=Usage.model_construct(
                 prompt_tokens=prompt_tokens,
                 completion_tokens=completion_tokens,
                 total_tokens=total_tokens,
@@ -1859,21 +2187,33 @@ async def chat_completions(
     except Exception as e:
         # Log error if we have a chat log
         if 'chat_log' in locals() and chat_log:
-            latency_ms = int((time.time() - start_time) * 1000) if 'start_time' in locals() else 0
+            latency_ms = int((time.monotonic() - start_time) * 1000) if 'start_time' in locals() else 0
             try:
-                ChatLogService.update_log(
+                await asyncio.to_thread(
+                    ChatLogService.update_log,
                     log_id=chat_log.id,
                     status="error",
                     error_message=str(e),
                     error_type=type(e).__name__,
                     latency_ms=latency_ms,
                 )
-                logger.error(f"Chat log error recorded: {chat_log.id}, error: {e}")
+                logger.error("Chat log error recorded: %s, error: %s", chat_log.id, e)
             except Exception as log_error:
-                logger.error(f"Failed to update chat log with error: {log_error}")
+                logger.error("Failed to update chat log with error: %s", log_error)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard]) and falls back
+    # to asyncio and h11 elsewhere, e.g. on Windows; an import string is required for workers > 1
+    uvicorn.run(
+        "server.server.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WORKERS", "1")),
+        loop="auto",
+        http="auto",
+        backlog=int(os.getenv("BACKLOG", "2048")),
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+    )
@@ -238,6 +238,101 @@ def test_rag_search_faq(kb_id):
     return data
 
 
+def test_rag_search_scores(kb_id):
+    """Test that search results carry similarity scores, best first"""
+    print("\n[Test] RAG Search - Scores:")
+    print_separator()
+    
+    response = requests.post(
+        f"{BASE_URL}/v1/rag/search?kb_id={kb_id}",
+        json={"query": "Who is the CEO of Acme?", "top_k": 3}
+    )
+    response.raise_for_status()
+    
+    scores = [result.get("score") for result in response.json().get("results", [])]
+    print(f"  Scores: {scores}")
+    
+    assert scores, "Should find relevant documents"
+    assert all(isinstance(score, float) for score in scores), "Every result should have a score"
+    assert scores == sorted(scores, reverse=True), "Results should be ordered by score"
+    
+    return scores
+
+
+def test_rag_search_batch(kb_id):
+    """Test the batched RAG search endpoint"""
+    print("\n[Test] RAG Search - Batch:")
+    print_separator()
+    
+    queries = ["What is the pricing for Acme products?", "What file formats are supported?"]
+    response = requests.post(
+        f"{BASE_URL}/v1/rag/search/batch?kb_id={kb_id}",
+        json={"queries": queries, "top_k": 2}
+    )
+    response.raise_for_status()
+    
+    results = response.json().get("results", [])
+    for entry in results:
+        sources = [r.get("source") for r in entry.get("results", [])]
+        print(f"  {entry.get('query')} -> {sources}")
+    
+    assert [entry.get("query") for entry in results] == queries, "One result set per query, in order"
+    for entry in results:
+        assert 0 < len(entry.get("results", [])) <= 2, "Each query should respect top_k"
+        assert all(isinstance(r.get("score"), float) for r in entry["results"]), "Batch results should have scores"
+    
+    pricing_content = " ".join(r.get("content", "").lower() for r in results[0]["results"])
+    assert "pricing" in pricing_content or "$" in pricing_content, \
+        "First query should return pricing information"
+    
+    return results
+
+
+def test_rag_import_batch_size(kb_id):
+    """Test importing documents with an explicit embedding batch size"""
+    print("\n[Test] RAG Import - Batch Size:")
+    print_separator()
+    
+    response = requests.post(
+        f"{BASE_URL}/v1/rag/import/documents?kb_id={kb_id}",
+        json={
+            "documents": [{"content": "Acme support hours: 9am-5pm PST, Monday to Friday.", "source": "support.txt"}],
+            "batch_size": 1,
+        },
+    )
+    response.raise_for_status()
+    
+    data = response.json()
+    print(f"  Imported {data.get('original_count')} documents -> {data.get('chunks_created')} chunks")
+    
+    assert data.get("status") == "success", "Import should succeed"
+    assert data.get("original_count") == 1
+    
+    return data
+
+
+def test_rag_import_invalid_body(kb_id):
+    """Test that invalid import bodies are rejected with FastAPI-style 422 errors"""
+    print("\n[Test] RAG Import - Invalid Body:")
+    print_separator()
+    
+    cases = [
+        ({"documents": [{"content": "x", "source": "x.txt"}], "batch_size": 0}, ["body", "batch_size"]),
+        ({"documents": [{"content": "x"}]}, ["body", "documents", 0, "source"]),
+        ({}, ["body", "documents"]),
+    ]
+    for body, loc in cases:
+        response = requests.post(f"{BASE_URL}/v1/rag/import/documents?kb_id={kb_id}", json=body)
+        print(f"  {body} -> {response.status_code}")
+        
+        assert response.status_code == 422, f"Expected 422, got {response.status_code}"
+        detail = response.json().get("detail")
+        assert isinstance(detail, list), "detail should be a list of validation errors"
+        assert any(error.get("loc") == loc for error in detail), f"Expected an error at {loc}, got {detail}"
+    
+    return True
+
+
 def test_chat_with_rag_context(kb_id):
     """Test chat completion that should use RAG context"""
     print("\n[Test] Chat with RAG Context:")
@@ -373,6 +468,10 @@ def run_all_tests():
         ("RAG Search - Company", lambda: test_rag_search(kb_id)),
         ("RAG Search - Technical", lambda: test_rag_search_technical(kb_id)),
         ("RAG Search - FAQ", lambda: test_rag_search_faq(kb_id)),
+        ("RAG Search - Scores", lambda: test_rag_search_scores(kb_id)),
+        ("RAG Search - Batch", lambda: test_rag_search_batch(kb_id)),
+        ("RAG Import - Batch Size", lambda: test_rag_import_batch_size(kb_id)),
+        ("RAG Import - Invalid Body", lambda: test_rag_import_invalid_body(kb_id)),
         ("Chat with RAG", lambda: test_chat_with_rag_context(kb_id)),
         ("Chat - Company Info", lambda: test_chat_company_info(kb_id)),
         ("Chat - Technical", lambda: test_chat_technical_question(kb_id)),
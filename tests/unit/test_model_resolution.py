@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from dotenv import load_dotenv
 
@@ -249,6 +252,90 @@ def test_chat_with_model_id():
     return result
 
 
+def test_chat_stream_frames():
+    """Test the shape of streamed chat completion SSE frames."""
+    print("\n[Test] Chat Stream Frames:")
+    print_separator()
+    
+    payload = {
+        "model": "nonexistent-model-xyz",
+        "messages": [
+            {"role": "user", "content": "Say hello"}
+        ],
+        "stream": True,
+    }
+    
+    with requests.post(f"{BASE_URL}/v1/chat/completions", json=payload, stream=True, timeout=120) as response:
+        response.raise_for_status()
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = [line for line in response.iter_lines(decode_unicode=True) if line]
+    
+    assert all(line.startswith("data: ") for line in lines), "Every SSE line should be a data frame"
+    assert lines[-1] == "data: [DONE]", "Stream should end with [DONE]"
+    
+    chunks = [json.loads(line[len("data: "):]) for line in lines[:-1]]
+    assert "error" not in chunks[-1], f"Stream reported an error: {chunks[-1]}"
+    print(f"  Received {len(chunks)} chunks")
+    
+    chat_id = chunks[0]["id"]
+    assert chat_id.startswith("chatcmpl-")
+    for chunk in chunks:
+        assert chunk["id"] == chat_id, "All chunks should share the completion id"
+        assert chunk["object"] == "chat.completion.chunk"
+        assert chunk["model"] == payload["model"]
+        assert len(chunk["choices"]) == 1 and chunk["choices"][0]["index"] == 0
+    
+    assert chunks[0]["choices"][0]["delta"]["role"] == "assistant", "First chunk should carry the role"
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop", "Last chunk should finish the stream"
+    content_chunks = chunks[1:-1]
+    assert content_chunks, "Stream should contain content chunks"
+    assert all(isinstance(c["choices"][0]["delta"]["content"], str) for c in content_chunks)
+    assert all(c["choices"][0]["finish_reason"] is None for c in content_chunks)
+    
+    content = "".join(c["choices"][0]["delta"]["content"] for c in content_chunks)
+    print(f"  Content preview: {content[:100]}...")
+    
+    return chunks
+
+
+def test_chat_admission_control():
+    """Test that streaming requests beyond the slot and queue limits are rejected with 429."""
+    print("\n[Test] Chat Admission Control:")
+    print_separator()
+    
+    # Must match the server's per-worker limits (see .env.example); assumes WORKERS=1
+    limit = int(os.getenv("MAX_CONCURRENT_LLM", "8")) + int(os.getenv("MAX_QUEUED_LLM", "32"))
+    burst = limit + 4
+    payload = {
+        "model": "nonexistent-model-xyz",
+        "messages": [
+            {"role": "user", "content": "Count from 1 to 50."}
+        ],
+        "stream": True,
+    }
+    
+    def open_stream(_):
+        # Only the status line is read; the body stays open so admissions are held
+        return requests.post(f"{BASE_URL}/v1/chat/completions", json=payload, stream=True, timeout=120)
+    
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        responses = list(pool.map(open_stream, range(burst)))
+    try:
+        statuses = [r.status_code for r in responses]
+        print(f"  Sent {burst} streaming requests (limit {limit})")
+        print(f"  200: {statuses.count(200)}, 429: {statuses.count(429)}")
+        
+        rejected = [r for r in responses if r.status_code == 429]
+        assert rejected, "Requests beyond the limit should be rejected with 429"
+        assert statuses.count(200) <= limit, "No more than the limit should be admitted"
+        assert all(r.headers.get("retry-after") for r in rejected), "429 responses should carry Retry-After"
+    finally:
+        for r in responses:
+            r.close()
+    
+    return statuses
+
+
 def run_all_tests():
     """Run all model resolution tests."""
     print("=" * 60)
@@ -263,6 +350,8 @@ def run_all_tests():
         ("Chat with Unknown Model", test_chat_with_unknown_model),
         ("Model Name Case Insensitive", test_model_name_case_insensitive),
         ("Chat with Model ID", test_chat_with_model_id),
+        ("Chat Stream Frames", test_chat_stream_frames),
+        ("Chat Admission Control", test_chat_admission_control),
     ]
     
     results = []